@@ -13,7 +13,7 @@
     # Check https://github.com/odoo/odoo/blob/14.0/odoo/addons/base/data/ir_module_category_data.xml
     # for the full list
     "category": "Sale/Purchase",
-    "version": "16.0.0.5",
+    "version": "16.0.0.10",
     "license": "LGPL-3",
     # any module necessary for this one to work correctly
     "depends": ["base", "base_setup", "contacts", "portal"],
@@ -21,6 +21,7 @@
     "data": [
         "security/contract_security.xml",
         "security/ir.model.access.csv",
+        "data/ir_sequence_data.xml",
         "wizard/contract_content_wizard_view.xml",
         "wizard/contract_publish_wizard_view.xml",
         "wizard/confirm_delete_wizard.xml",
@@ -28,13 +29,19 @@
         "wizard/contract_line_wizard_view.xml",
         "wizard/contract_version_creation_wizard_view.xml",
         "wizard/contract_section_wizard_view.xml",
+        "wizard/contract_version_diff_wizard_view.xml",
         "views/contract_annex.xml",
         "views/contract_section_view.xml",
         "views/contract_line_view.xml",
         "views/contract_content_view.xml",
         "views/contract_version_view.xml",
+        "views/contract_version_templates.xml",
         "views/contract.xml",
+        "views/contract_annex_total_view.xml",
+        "views/contract_portfolio_report_view.xml",
+        "views/contract_profile_log_view.xml",
         "views/partner.xml",
+        "views/portal_templates.xml",
         "views/res_config_settings.xml",
         "data/mail_template_data.xml",
         "data/schedule_activities_data.xml",
@@ -0,0 +1,2 @@
+from . import contract_annex_totals
+from . import contract_import
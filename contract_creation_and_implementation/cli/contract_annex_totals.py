@@ -0,0 +1,33 @@
+import argparse
+import logging
+import os
+
+import odoo
+from odoo import SUPERUSER_ID, api
+from odoo.cli import Command
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+
+class ContractAnnexTotals(Command):
+    """Rebuild the annex cost totals of contracts from their annexes"""
+
+    name = "contract_annex_totals"
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog="%s contract_annex_totals"
+            % os.path.basename(odoo.cli.command.__file__),
+            description=self.__doc__,
+        )
+        parser.add_argument("-c", "--config", help="Odoo configuration file")
+        parser.add_argument("-d", "--database", required=True)
+        args = parser.parse_args(cmdargs)
+
+        config.parse_config(["-c", args.config] if args.config else [])
+        registry = odoo.registry(args.database)
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env["contract.annex.total"].rebuild()
+        _logger.info("Annex cost totals rebuilt in %s", args.database)
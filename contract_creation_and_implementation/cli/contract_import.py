@@ -0,0 +1,120 @@
+import argparse
+import csv
+import json
+import logging
+import os
+
+import odoo
+from odoo import SUPERUSER_ID, api, fields
+from odoo.cli import Command
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+CSV_TRUE = {"1", "true", "yes", "y", "t"}
+
+
+def convert_csv_value(env, field, value):
+    """Return the CSV cell ``value`` as a value for ``field``: booleans,
+    numbers and dates are parsed, many2one cells hold a database id or an
+    external id."""
+    value = value.strip()
+    if field.type == "boolean":
+        return value.lower() in CSV_TRUE
+    if not value:
+        return False
+    if field.type == "integer":
+        return int(value)
+    if field.type in ("float", "monetary"):
+        return float(value)
+    if field.type == "date":
+        return fields.Date.to_date(value)
+    if field.type == "datetime":
+        return fields.Datetime.to_datetime(value)
+    if field.type == "many2one":
+        return int(value) if value.isdigit() else env.ref(value).id
+    return value
+
+
+def read_csv_trees(env, path):
+    """Build contract trees from a flat CSV file with one clause per row.
+
+    Columns prefixed with ``contract.`` hold contract field values, the
+    others are ``version_number``, ``is_published``, ``is_signed``,
+    ``section_number``, ``section_name``, ``line_number`` and ``content``.
+    Rows of a contract must be contiguous.
+    """
+    contract_fields = env["contract.contract"]._fields
+    version_fields = env["contract.version"]._fields
+    trees = []
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            contract = {
+                key[len("contract.") :]: convert_csv_value(
+                    env, contract_fields[key[len("contract.") :]], value
+                )
+                for key, value in row.items()
+                if key.startswith("contract.") and value != ""
+            }
+            if not trees or trees[-1]["_key"] != contract:
+                trees.append({"_key": contract, **contract, "versions": []})
+            versions = trees[-1]["versions"]
+            version = {
+                name: convert_csv_value(env, version_fields[name], row[name])
+                for name in ("version_number", "is_published", "is_signed")
+                if row.get(name)
+            }
+            version.setdefault("version_number", 1)
+            if (
+                not versions
+                or versions[-1]["version_number"] != version["version_number"]
+            ):
+                versions.append({**version, "sections": []})
+            sections = versions[-1]["sections"]
+            if not sections or sections[-1]["number"] != row.get("section_number"):
+                sections.append(
+                    {
+                        "number": row.get("section_number"),
+                        "name": row.get("section_name"),
+                        "lines": [],
+                    }
+                )
+            sections[-1]["lines"].append(
+                {"number": row.get("line_number"), "content": row.get("content")}
+            )
+    for tree in trees:
+        del tree["_key"]
+    return trees
+
+
+class ContractImport(Command):
+    """Import contracts with their versions, sections and clauses"""
+
+    name = "contract_import"
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog="%s contract_import" % os.path.basename(odoo.cli.command.__file__),
+            description=self.__doc__,
+        )
+        parser.add_argument("-c", "--config", help="Odoo configuration file")
+        parser.add_argument("-d", "--database", required=True)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "file", help="JSON list of contract trees or flat CSV file (.csv)"
+        )
+        args = parser.parse_args(cmdargs)
+
+        config.parse_config(["-c", args.config] if args.config else [])
+        registry = odoo.registry(args.database)
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            if args.file.endswith(".csv"):
+                trees = read_csv_trees(env, args.file)
+            else:
+                with open(args.file, encoding="utf-8") as json_file:
+                    trees = json.load(json_file)
+            count = env["contract.contract"].import_contract_trees(
+                trees, batch_size=args.batch_size
+            )
+        _logger.info("%s contracts imported into %s", count, args.database)
@@ -0,0 +1,81 @@
+from odoo import api, http
+from odoo.http import content_disposition, request
+
+from ..models.contract_document import EXPORT_FORMATS
+
+
+class ContractExportController(http.Controller):
+    def _stream(self, export, file_name, content_type):
+        """Stream the bytes returned by ``export(env)``.
+
+        The response body is produced after the request cursor is closed,
+        so the export runs in its own cursor.
+        """
+        registry = request.env.registry
+        uid = request.env.uid
+        context = dict(request.env.context)
+
+        def generate():
+            with registry.cursor() as cr:
+                yield from export(api.Environment(cr, uid, context))
+
+        return request.make_response(
+            generate(),
+            headers=[
+                ("Content-Type", content_type),
+                ("Content-Disposition", content_disposition(file_name)),
+            ],
+        )
+
+    @http.route(
+        "/contract/version/<int:version_id>/export/<string:export_format>",
+        type="http",
+        auth="user",
+    )
+    def export_version(self, version_id, export_format):
+        version = request.env["contract.version"].browse(version_id).exists()
+        if not version or export_format not in EXPORT_FORMATS:
+            raise request.not_found()
+        version.check_access_rule("read")
+        return self._stream(
+            lambda env: env["contract.version"]
+            .browse(version_id)
+            .export_document(export_format),
+            version._get_document_file_name(export_format),
+            EXPORT_FORMATS[export_format][0],
+        )
+
+    @http.route(
+        [
+            "/contract/partner/<int:partner_id>/export/<string:export_format>",
+            "/contract/company/<int:company_id>/export/<string:export_format>",
+        ],
+        type="http",
+        auth="user",
+    )
+    def export_signed_versions(self, export_format, partner_id=None, company_id=None):
+        if export_format not in EXPORT_FORMATS:
+            raise request.not_found()
+        if partner_id:
+            domain = [("partner_id", "=", partner_id)]
+        else:
+            domain = [("company_id", "=", company_id)]
+        return self._stream(
+            lambda env: env["contract.version"].export_signed_documents(
+                domain, export_format
+            ),
+            "signed_contracts.zip",
+            "application/zip",
+        )
+
+
+class ContractTreeController(http.Controller):
+    @http.route("/contract/version/<int:version_id>/tree", type="json", auth="user")
+    def version_tree(self, version_id, fields=None, after_section_id=None, limit=None):
+        """Return the nested tree of a version, see ``contract.version.get_tree``."""
+        version = request.env["contract.version"].browse(version_id).exists()
+        if not version:
+            raise request.not_found()
+        return version.get_tree(
+            fields=fields, after_section_id=after_section_id, limit=limit
+        )
@@ -0,0 +1,127 @@
+from odoo import http
+from odoo.http import request
+
+from odoo.addons.portal.controllers.portal import CustomerPortal
+
+# Published or signed version in force on a contract of the commercial partner,
+# with the fingerprint of its rendered document.
+PORTAL_VERSION_QUERY = """
+    SELECT v.id, r.fingerprint
+      FROM contract_version v
+      JOIN contract_contract c ON c.id = v.contract_id
+      JOIN res_partner p ON p.id = c.partner_id
+      LEFT JOIN contract_version_render r ON r.version_id = v.id
+     WHERE v.id = %(version_id)s
+       AND c.id = %(contract_id)s
+       AND p.commercial_partner_id = %(partner_id)s
+       AND v.id IN (c.published_version_id, c.signed_version_id)
+       AND (v.is_published OR v.is_signed)
+"""
+
+
+class ContractPortal(CustomerPortal):
+    def _get_portal_contract_domain(self):
+        partner = request.env.user.partner_id.commercial_partner_id
+        return [
+            ("partner_id", "child_of", partner.id),
+            "|",
+            ("published_version_id", "!=", False),
+            ("signed_version_id", "!=", False),
+        ]
+
+    def _prepare_home_portal_values(self, counters):
+        values = super()._prepare_home_portal_values(counters)
+        if "contract_count" in counters:
+            values["contract_count"] = (
+                request.env["contract.contract"]
+                .sudo()
+                .search_count(self._get_portal_contract_domain())
+            )
+        return values
+
+    @http.route("/my/contracts", type="http", auth="user")
+    def portal_my_contracts(self, after=None, **kw):
+        """List the contracts newest first, a page at a time. ``after`` is
+        the id of the last contract of the previous page."""
+        domain = self._get_portal_contract_domain()
+        if after and after.isdigit():
+            domain += [("id", "<", int(after))]
+        contracts = (
+            request.env["contract.contract"]
+            .sudo()
+            .search(domain, order="id desc", limit=self._items_per_page + 1)
+        )
+        values = self._prepare_portal_layout_values()
+        values.update(
+            {
+                "contracts": contracts[: self._items_per_page],
+                "next_after": len(contracts) > self._items_per_page
+                and contracts[self._items_per_page - 1].id,
+                "page_name": "contract",
+            }
+        )
+        return request.render("contract.portal_my_contracts", values)
+
+    @http.route("/my/contracts/<int:contract_id>", type="http", auth="user")
+    def portal_my_contract(self, contract_id, **kw):
+        contract = (
+            request.env["contract.contract"]
+            .sudo()
+            .search(self._get_portal_contract_domain() + [("id", "=", contract_id)])
+        )
+        if not contract:
+            raise request.not_found()
+        version = contract.signed_version_id or contract.published_version_id
+        return request.redirect(
+            "/my/contracts/%s/versions/%s" % (contract.id, version.id)
+        )
+
+    @http.route(
+        "/my/contracts/<int:contract_id>/versions/<int:version_id>",
+        type="http",
+        auth="user",
+    )
+    def portal_contract_version(self, contract_id, version_id, **kw):
+        """Render a published or signed version.
+
+        A version can be rolled back and republished, or stop being in force,
+        under the same URL. The browser therefore revalidates on every view:
+        access is checked by one query, and an unchanged document is answered
+        by its ETag without rendering it again."""
+        params = {
+            "version_id": version_id,
+            "contract_id": contract_id,
+            "partner_id": request.env.user.partner_id.commercial_partner_id.id,
+        }
+        request.env.cr.execute(PORTAL_VERSION_QUERY, params)
+        row = request.env.cr.fetchone()
+        if not row:
+            raise request.not_found()
+        version = request.env["contract.version"].sudo().browse(version_id)
+        fingerprint = row[1]
+        if not fingerprint:
+            request.env["contract.version.render"].sudo()._get_html(version)
+            request.env.cr.execute(PORTAL_VERSION_QUERY, params)
+            fingerprint = request.env.cr.fetchone()[1]
+        etag = '"%s-%s"' % (version_id, fingerprint)
+        headers = [
+            ("ETag", etag),
+            # partner data: cached by the browser only, always revalidated
+            ("Cache-Control", "private, no-cache"),
+        ]
+        if etag in request.httprequest.headers.get("If-None-Match", ""):
+            return request.make_response("", headers=headers, status=304)
+        values = self._prepare_portal_layout_values()
+        values.update(
+            {
+                "contract": version.contract_id,
+                "version": version,
+                "document": request.env["contract.version.render"]
+                .sudo()
+                ._get_html(version),
+                "page_name": "contract",
+            }
+        )
+        response = request.render("contract.portal_contract_version", values)
+        response.headers.extend(headers)
+        return response
@@ -0,0 +1,18 @@
+def migrate(cr, version):
+    """Start the version journal with the versions in force, in their order
+    of creation, which is the order the previous rollback relied on."""
+    cr.execute(
+        """INSERT INTO contract_version_event (contract_id, version_id, event, kind,
+                                               in_force_version_id, event_date,
+                                               create_uid, create_date,
+                                               write_uid, write_date)
+           SELECT v.contract_id, v.id, e.event, e.kind, v.id,
+                  COALESCE(v.create_date, now() at time zone 'UTC'),
+                  1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+             FROM contract_version v
+             JOIN (VALUES ('publish', 'publication'), ('sign', 'signature'))
+                  AS e(event, kind)
+               ON (e.event = 'publish' AND v.is_published)
+               OR (e.event = 'sign' AND v.is_signed)
+            ORDER BY e.event, v.create_date, v.id"""
+    )
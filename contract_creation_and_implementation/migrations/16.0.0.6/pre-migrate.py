@@ -0,0 +1,33 @@
+def migrate(cr, version):
+    """Fill the clause fingerprint and merge clauses with identical text,
+    so that the unique index on ``content_hash`` can be created."""
+    cr.execute(
+        """ALTER TABLE contract_content ADD COLUMN IF NOT EXISTS content_hash varchar;
+        UPDATE contract_content
+           SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+         WHERE content IS NOT NULL AND content != '';
+        CREATE TEMPORARY TABLE contract_content_merge ON COMMIT DROP AS
+            SELECT c.id AS old_id, keep.id AS new_id
+              FROM contract_content c
+              JOIN (SELECT content_hash, min(id) AS id
+                      FROM contract_content
+                     WHERE content_hash IS NOT NULL
+                     GROUP BY content_hash
+                    HAVING count(*) > 1) keep
+                ON keep.content_hash = c.content_hash AND keep.id != c.id;
+        UPDATE contract_line l
+           SET current_content_id = m.new_id
+          FROM contract_content_merge m
+         WHERE l.current_content_id = m.old_id;
+        INSERT INTO contract_line_content_rel (line_id, content_id)
+        SELECT DISTINCT r.line_id, m.new_id
+          FROM contract_line_content_rel r
+          JOIN contract_content_merge m ON m.old_id = r.content_id
+        ON CONFLICT DO NOTHING;
+        DELETE FROM contract_line_content_rel r
+         USING contract_content_merge m
+         WHERE r.content_id = m.old_id;
+        DELETE FROM contract_content c
+         USING contract_content_merge m
+         WHERE c.id = m.old_id;"""
+    )
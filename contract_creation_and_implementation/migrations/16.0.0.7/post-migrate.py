@@ -0,0 +1,13 @@
+from odoo import SUPERUSER_ID, api, fields
+
+
+def migrate(cr, version):
+    """Continue today's contract numbering from the contracts already created."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    today = fields.Date.today()
+    cr.execute(
+        "SELECT count(*) FROM contract_contract WHERE create_date >= %s", [today]
+    )
+    (created_today,) = cr.fetchone()
+    sequence = env.ref("contract.seq_contract_contract")
+    sequence._create_date_range_seq(today).number_next = created_today + 1
@@ -0,0 +1,16 @@
+def migrate(cr, version):
+    """Renumber sections and lines with gaps, keeping their current order."""
+    cr.execute(
+        """UPDATE contract_section s
+              SET sequence = r.position * 1024
+             FROM (SELECT id, row_number() OVER (PARTITION BY version_id
+                                                 ORDER BY sequence, id) AS position
+                     FROM contract_section) r
+            WHERE s.id = r.id;
+        UPDATE contract_line l
+           SET sequence = r.position * 1024
+          FROM (SELECT id, row_number() OVER (PARTITION BY section_id
+                                              ORDER BY sequence, id) AS position
+                  FROM contract_line) r
+         WHERE l.id = r.id;"""
+    )
@@ -0,0 +1,7 @@
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Fill the annex cost totals from the existing annexes."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["contract.annex.total"].rebuild()
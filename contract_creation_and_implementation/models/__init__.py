@@ -1,10 +1,19 @@
 # -*- coding: utf-8 -*-
 
+from . import contract_settings
+from . import contract_profile
+from . import contract_version_lock
+from . import contract_sequence
 from . import contract
 from . import contract_annex
+from . import contract_annex_total
 from . import partner
 from . import res_config_settings
+from . import ir_sequence
 from . import contract_content
 from . import contract_line
 from . import contract_section
 from . import contract_version
+from . import contract_version_render
+from . import contract_version_event
+from . import contract_portfolio_report
@@ -1,12 +1,52 @@
 import datetime
 import logging
-from dateutil.relativedelta import relativedelta
+import threading
+import time
 
-from odoo import api, fields, models, _
+from odoo import api, fields, models, Command, _
 from odoo.exceptions import AccessError, UserError
+from odoo.osv import expression
+from odoo.tools import groupby
+
+from .contract_profile import profiled
 
 _logger = logging.getLogger(__name__)
 
+# Moves the expiration date of the given contracts by as many renew periods
+# as needed to pass today, at least one. The step is counted in days or in
+# months (years are 12 months); a step moved onto a shorter month end can
+# land on today, hence the extra step of the CASE.
+RENEW_QUERY = """
+    WITH periods AS (
+        SELECT id, expiration_date AS old,
+               GREATEST(FLOOR(({elapsed}) / %(step)s) + 1, 1)::int AS count
+          FROM contract_contract
+         WHERE id = ANY(%(ids)s) AND expiration_date IS NOT NULL
+    ), dates AS (
+        SELECT id, old, count,
+               (old + make_interval({unit} => count * %(step)s))::date AS new
+          FROM periods
+    )
+    UPDATE contract_contract c
+       SET expiration_date = CASE
+               WHEN d.new > %(today)s OR d.old > %(today)s THEN d.new
+               ELSE (d.old + make_interval({unit} => (d.count + 1) * %(step)s))::date
+           END,
+           write_uid = %(uid)s,
+           write_date = (now() at time zone 'UTC')
+      FROM dates d
+     WHERE c.id = d.id
+ RETURNING c.id, d.old, c.expiration_date
+"""
+RENEW_UNITS = {
+    "days": ("days", "%(today)s - old"),
+    "months": (
+        "months",
+        "EXTRACT(YEAR FROM AGE(%(today)s, old)) * 12"
+        " + EXTRACT(MONTH FROM AGE(%(today)s, old))",
+    ),
+}
+
 
 class Contract(models.Model):
     _name = "contract.contract"
@@ -16,20 +56,6 @@ class Contract(models.Model):
         "mail.activity.mixin",
     ]
 
-    def _get_default_name(self):
-        """Returns name format `№YYMM-D-N`,
-        where N is a sequence number of contracts which are created this day
-        """
-        today = datetime.datetime.now().replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        contracts_today = self.search([("create_date", ">=", today)])
-        contract_date = "{format_date}-{number}".format(
-            format_date=datetime.date.strftime(datetime.date.today(), "%y%m-%d"),
-            number=len(contracts_today) + 1,
-        )
-        return contract_date
-
     allow_not_signed_contract = fields.Boolean(
         compute="get_allow_not_signed_contract",
         store=False,
@@ -47,6 +73,14 @@ class Contract(models.Model):
         required=True,
     )
     contract_annex_amount = fields.Integer(default=0, help="Counter for tech purposes")
+    annex_cost_total = fields.Monetary(
+        string="Annexes Cost",
+        currency_field="currency_id",
+        readonly=True,
+        copy=False,
+        default=0,
+        help="Sum of the annex costs, maintained by the annexes",
+    )
     contract_annex_ids = fields.One2many(
         comodel_name="contract.annex",
         inverse_name="contract_id",
@@ -71,21 +105,38 @@ class Contract(models.Model):
         string="Draft Versions",
         domain=[("is_published", "=", False)],
     )
-    expiration_date = fields.Date(string="Contract expiration date")
+    expiration_date = fields.Date(string="Contract expiration date", tracking=True)
+
+    last_notification_date = fields.Date(
+        string="Last expiration notice",
+        readonly=True,
+        copy=False,
+        help="Date of the last expiration notice, so that it is sent only once",
+    )
 
     name = fields.Char(
         string="Contract number",
-        default=lambda self: self._get_default_name(),
         readonly=False,
+        copy=False,
+        help="Assigned on save in the format `YYMM-DD-N`, "
+        "where N is a sequence number of contracts which are created this day",
     )
 
+    next_action_date = fields.Date(
+        compute="_compute_next_action_date",
+        store=True,
+        index=True,
+        help="Date of the next expiration notice, renewal or closure of a signed contract",
+    )
     notification_expiration = fields.Boolean(
         default=False,
         string="Contract expiration notice",
         help="Notify the responsible employee of the expiration of the contract",
     )
     notification_expiration_period = fields.Integer(
-        default=1,
+        default=lambda self: self.env["contract.settings"].get(
+            "notification_expiration_period"
+        ),
         string="Notice period, days",
         help="The day's number to contract expiration for sending notice",
     )
@@ -109,7 +160,10 @@ class Contract(models.Model):
     renew_automatically = fields.Boolean(
         default=False, string="Renew contract automatically"
     )
-    renew_period = fields.Integer(default=1, string="Contract renew period")
+    renew_period = fields.Integer(
+        default=lambda self: self.env["contract.settings"].get("renew_period"),
+        string="Contract renew period",
+    )
     renew_period_type = fields.Selection(
         [
             ("days", "Days"),
@@ -117,7 +171,7 @@ class Contract(models.Model):
             ("years", "Years"),
         ],
         string="Type of contract renew period",
-        default="days",
+        default=lambda self: self.env["contract.settings"].get("renew_period_type"),
         required=True,
     )
     responsible_employee_id = fields.Many2one(
@@ -166,31 +220,235 @@ class Contract(models.Model):
         string="Versions",
         copy=False,
     )
+    version_event_ids = fields.One2many(
+        "contract.version.event",
+        "contract_id",
+        string="Version History",
+        copy=False,
+        readonly=True,
+    )
 
     @api.depends("version_ids")
     def _compute_version_count(self):
+        data = self.env["contract.version"].read_group(
+            [("contract_id", "in", self.ids)], ["contract_id"], ["contract_id"]
+        )
+        counts = {item["contract_id"][0]: item["contract_id_count"] for item in data}
         for record in self:
-            record.version_count = len(record.version_ids)
-
-    @api.model
-    def create(self, vals):
+            record.version_count = counts.get(record.id, 0)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if not vals.get("name"):
+                vals["name"] = self.env["ir.sequence"].next_by_code("contract.contract")
+        contracts = super().create(vals_list)
         if self.env.context.get("copy") is not True:
-            contract = super().create(vals)
+            # contracts imported with their versions don't get an empty one
             self.env["contract.version"].create(
-                {
-                    "contract_id": contract.id,
-                    "version_number": 1,
-                }
+                [
+                    {
+                        "contract_id": contract.id,
+                        "version_number": 1,
+                    }
+                    for contract, vals in zip(contracts, vals_list)
+                    if not vals.get("version_ids")
+                ]
             )
-            return contract
-        else:
-            return super().create(vals)
+        return contracts
+
+    def write(self, vals):
+        res = super(Contract, self).write(vals)
+        if {"partner_id", "company_id", "currency_id"} & set(vals):
+            self.env["contract.annex.total"]._sync_contracts(self)
+        return res
 
     def unlink(self):
         self.contract_annex_ids.unlink()
         return super(Contract, self).unlink()
 
+    @api.model
+    @profiled("import_contract_trees")
+    def import_contract_trees(self, trees, batch_size=500):
+        """Create whole contracts from ``trees`` through batched multi-creates.
+
+        Each tree is a dict of contract field values, plus optional keys:
+
+        - ``versions``: list of dicts with ``version_number``, ``is_published``,
+          ``is_signed`` and ``sections``, a list of dicts with ``name``,
+          ``number`` and ``lines``, a list of dicts with ``number`` and
+          ``content`` (the clause text);
+        - ``annexes``: list of dicts of annex field values.
+
+        Trees are created ``batch_size`` at a time and every batch is
+        committed, so that a failure only loses the current batch.
+
+        :return: number of imported contracts
+        """
+        start = time.monotonic()
+        for offset in range(0, len(trees), batch_size):
+            self._import_contract_batch(trees[offset : offset + batch_size])
+            if not getattr(threading.current_thread(), "testing", False):
+                self.env.cr.commit()
+            done = min(offset + batch_size, len(trees))
+            _logger.info(
+                "Imported %s/%s contracts (%.1f contracts/s)",
+                done,
+                len(trees),
+                done / max(time.monotonic() - start, 1e-6),
+            )
+        return len(trees)
+
+    def _import_contract_batch(self, trees):
+        texts = [
+            line.get("content") or ""
+            for tree in trees
+            for version in tree.get("versions", [])
+            for section in version.get("sections", [])
+            for line in section.get("lines", [])
+        ]
+        contents = self.env["contract.content"]._find_or_create_multi(texts)
+        vals_list = []
+        for tree in trees:
+            vals = {
+                key: value
+                for key, value in tree.items()
+                if key not in ("versions", "annexes")
+            }
+            vals["version_ids"] = [
+                Command.create(self._prepare_import_version(version, index, contents))
+                for index, version in enumerate(
+                    tree.get("versions") or [{"version_number": 1}], 1
+                )
+            ]
+            vals["contract_annex_ids"] = [
+                Command.create(annex) for annex in tree.get("annexes", [])
+            ]
+            vals_list.append(vals)
+        contracts = self.create(vals_list)
+        self.env.flush_all()
+        # nested creation only sets the direct parent of sections and lines
+        self.env.cr.execute(
+            """
+            UPDATE contract_section s
+               SET contract_id = v.contract_id
+              FROM contract_version v
+             WHERE v.id = s.version_id AND v.contract_id = ANY(%(ids)s);
+            UPDATE contract_line l
+               SET contract_id = s.contract_id
+              FROM contract_section s
+             WHERE s.id = l.section_id AND s.contract_id = ANY(%(ids)s);
+            """,
+            {"ids": contracts.ids},
+        )
+        self.env["contract.section"].invalidate_model(["contract_id"])
+        self.env["contract.line"].invalidate_model(["contract_id"])
+
+        published = self.env["contract.version"]
+        signed = self.env["contract.version"]
+        for contract, tree in zip(contracts, trees):
+            for version, version_tree in zip(
+                contract.version_ids.sorted("id"), tree.get("versions", [])
+            ):
+                if version_tree.get("is_published"):
+                    published |= version
+                if version_tree.get("is_signed"):
+                    signed |= version
+        # flags are set once the trees exist, published content is frozen
+        published.write({"is_published": True})
+        signed.write({"is_signed": True})
+        self._set_versions_in_force(published, "published_version_id")
+        self._set_versions_in_force(signed, "signed_version_id")
+        self.env["contract.version.event"]._log(
+            [
+                {
+                    "contract_id": version.contract_id.id,
+                    "version_id": version.id,
+                    "event": event,
+                    "in_force_version_id": version.id,
+                }
+                for event, versions in (("publish", published), ("sign", signed))
+                for version in versions.sorted("version_number")
+            ]
+        )
+        return contracts
+
+    @api.model
+    def _prepare_import_version(self, version, index, contents):
+        return {
+            "version_number": version.get("version_number", index),
+            "section_ids": [
+                Command.create(
+                    {
+                        "name": section.get("name"),
+                        "number": section.get("number"),
+                        "line_ids": [
+                            Command.create(self._prepare_import_line(line, contents))
+                            for line in section.get("lines", [])
+                        ],
+                    }
+                )
+                for section in version.get("sections", [])
+            ],
+        }
+
+    @api.model
+    def _prepare_import_line(self, line, contents):
+        content = contents[line.get("content") or ""]
+        return {
+            "number": line.get("number"),
+            "current_content_id": content.id,
+            "content_ids": [Command.set(content.ids)],
+        }
+
+    def _set_versions_in_force(self, versions, field_name):
+        """Point ``field_name`` of the contracts of ``versions`` to their last
+        version in one statement."""
+        if not versions:
+            return
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            UPDATE contract_contract c
+               SET "{field}" = v.id
+              FROM (SELECT DISTINCT ON (contract_id) id, contract_id
+                      FROM contract_version
+                     WHERE id = ANY(%s)
+                     ORDER BY contract_id, version_number DESC) v
+             WHERE c.id = v.contract_id
+            """.format(field=field_name),
+            [versions.ids],
+        )
+        versions.contract_id.invalidate_recordset([field_name])
+
+    @api.model
+    def _add_annex_amount(self, annex_count, sign=1):
+        """Shift the annex counters of several contracts in one locked statement.
+
+        :param annex_count: dict {contract id: number of annexes}
+        :param sign: 1 when annexes are created, -1 when they are deleted
+        :return: dict {contract id: updated counter}
+        """
+        if not annex_count:
+            return {}
+        self.flush_model(["contract_annex_amount"])
+        self.env.cr.execute(
+            """
+            UPDATE contract_contract c
+               SET contract_annex_amount = COALESCE(c.contract_annex_amount, 0)
+                                           + %s * v.amount
+              FROM unnest(%s::int[], %s::int[]) AS v(id, amount)
+             WHERE c.id = v.id
+         RETURNING c.id, c.contract_annex_amount
+            """,
+            [sign, list(annex_count), list(annex_count.values())],
+        )
+        amounts = dict(self.env.cr.fetchall())
+        self.browse(amounts).invalidate_recordset(["contract_annex_amount"])
+        return amounts
+
     @api.returns("self", lambda value: value.id)
+    @profiled("copy")
     def copy(self, default=None):
         if not self.published_version_id:
             raise UserError(_("Cannot duplicate without a published version."))
@@ -205,20 +463,18 @@ class Contract(models.Model):
                 "version_number": 1,
             }
         )
-        for section in current_version.section_ids:
-            new_section = section.copy(
-                {"contract_id": new_contract.id, "version_id": new_version.id}
-            )
-            for line in section.line_ids:
-                new_line = line.copy(
-                    {"section_id": new_section.id, "contract_id": new_contract.id}
-                )
+        current_version.copy_tree_to(new_version)
         return new_contract
 
+    def get_version_in_force(self, date, kind="signature"):
+        """Return the version signed, or published with ``kind="publication"``,
+        on this contract at ``date``."""
+        self.ensure_one()
+        return self.env["contract.version.event"]._get_in_force(self, kind, date)
+
     def get_allow_not_signed_contract(self):
-        ir_config = self.env["ir.config_parameter"].sudo()
-        allow_not_signed_contract = ir_config.get_param(
-            "contract.allow_not_signed_contract"
+        allow_not_signed_contract = self.env["contract.settings"].get(
+            "allow_not_signed_contract"
         )
         for record in self:
             record.allow_not_signed_contract = allow_not_signed_contract
@@ -270,6 +526,17 @@ class Contract(models.Model):
         if self.state != "sign":
             raise UserError(_("Cannot sign without a sign status."))
         self.signed_version_id.write({"is_signed": False})
+        self.env["contract.version.event"]._log(
+            [
+                {
+                    "contract_id": contract.id,
+                    "version_id": contract.signed_version_id.id,
+                    "event": "unsign",
+                    "in_force_version_id": False,
+                }
+                for contract in self
+            ]
+        )
         self.write(
             {"state": "draft", "date_conclusion": False, "signed_version_id": False}
         )
@@ -280,50 +547,207 @@ class Contract(models.Model):
     def action_renew(self):
         self.write({"state": "draft"})
 
+    @profiled("renew_contract")
     def renew_contract(self):
-        renew_period = {self.renew_period_type: self.renew_period}
-        new_expiration_date = self.expiration_date + relativedelta(**renew_period)
-        self.write({"expiration_date": new_expiration_date})
+        """Move the expiration date forward by one renew period, or by as
+        many as needed to pass today when renewals were missed.
 
-    def check_contracts(self):
-        # Select active contracts
-        contracts = self.search(
-            [
-                ("state", "=", "sign"),
-            ]
+        There is one UPDATE per (renew_period_type, renew_period) group, and
+        the changes are tracked on the contracts in batch.
+        """
+        today = datetime.date.today()
+        self.flush_recordset(["expiration_date", "renew_period", "renew_period_type"])
+        changes = {}
+        for (period_type, period), contracts in groupby(
+            self.filtered("expiration_date"),
+            key=lambda c: (c.renew_period_type, c.renew_period),
+        ):
+            unit, elapsed = RENEW_UNITS["days" if period_type == "days" else "months"]
+            self.env.cr.execute(
+                RENEW_QUERY.format(unit=unit, elapsed=elapsed),
+                {
+                    "ids": [c.id for c in contracts],
+                    "step": period * 12 if period_type == "years" else period,
+                    "today": today,
+                    "uid": self.env.uid,
+                },
+            )
+            changes.update(
+                (contract_id, (old, new))
+                for contract_id, old, new in self.env.cr.fetchall()
+            )
+            _logger.info(
+                "Renewed %s contracts by %s %s", len(contracts), period, period_type
+            )
+        renewed = self.browse(changes)
+        renewed.invalidate_recordset(["expiration_date", "write_uid", "write_date"])
+        renewed.modified(["expiration_date"])
+        if not self.env.context.get("tracking_disable"):
+            renewed._track_renewal(changes)
+
+    def _track_renewal(self, changes):
+        """Log the expiration date changes ``{id: (old, new)}`` as tracking
+        messages, with one create per model."""
+        messages = self._message_log_batch(
+            bodies={
+                contract_id: _("The contract has been renewed automatically.")
+                for contract_id in changes
+            }
         )
+        col_info = self.fields_get(["expiration_date"])["expiration_date"]
+        tracking = self.env["mail.tracking.value"]
+        tracking_values = []
+        for message in messages:
+            old, new = changes[message.res_id]
+            values = tracking.create_tracking_values(
+                old, new, "expiration_date", col_info, 100, self._name
+            )
+            values["mail_message_id"] = message.id
+            tracking_values.append(values)
+        tracking.sudo().create(tracking_values)
+
+    @api.depends(
+        "state",
+        "expiration_date",
+        "notification_expiration",
+        "notification_expiration_period",
+        "last_notification_date",
+    )
+    def _compute_next_action_date(self):
+        for contract in self:
+            if contract.state != "sign" or not contract.expiration_date:
+                contract.next_action_date = False
+                continue
+            next_action_date = contract.expiration_date
+            if contract.notification_expiration:
+                notice_date = contract.expiration_date - datetime.timedelta(
+                    days=contract.notification_expiration_period
+                )
+                if (
+                    not contract.last_notification_date
+                    or contract.last_notification_date < notice_date
+                ):
+                    next_action_date = min(next_action_date, notice_date)
+            contract.next_action_date = next_action_date
+
+    @profiled("check_contracts")
+    def check_contracts(self, batch_size=1000):
+        """Send the due expiration notices, then renew or close the expired
+        contracts. Only contracts whose ``next_action_date`` has come are read,
+        and actions missed by earlier runs are caught up."""
+        today = datetime.date.today()
+        due = [("state", "=", "sign"), ("next_action_date", "<=", today)]
+        # the notice is the pending action as long as the contract runs
+        notifying = due + [("expiration_date", ">", today)]
+        expired = due + [("expiration_date", "<=", today)]
         try:
             template_name = "contract.contract_expiration_notification"
             template = self.env.ref(template_name)
         except ValueError:
             _logger.error('Template "%s" not found!', template_name)
         else:
-            for contract in contracts:
-                if contract._send_notification_today():
-                    if contract.responsible_employee_id.notification_type == "email":
-                        template.send_mail(contract.id)
+            self._process_in_batches(
+                notifying,
+                lambda contracts: contracts._send_expiration_notification(
+                    template, today
+                ),
+                batch_size,
+            )
         finally:
-            for contract in contracts:
-                if (
-                    contract.renew_automatically
-                    and contract.expiration_date == datetime.date.today()
-                ):
-                    contract.renew_contract()
-                elif (
-                    not contract.renew_automatically
-                    and contract.expiration_date == datetime.date.today()
-                ):
-                    contract.action_close()
-
-    def _send_notification_today(self):
-        return (
-            self.responsible_employee_id
-            and self.notification_expiration
-            and self.expiration_date
-            and self.expiration_date
-            - datetime.timedelta(days=self.notification_expiration_period)
-            == datetime.date.today()
+            self._process_in_batches(
+                expired + [("renew_automatically", "=", True)],
+                lambda contracts: contracts.renew_contract(),
+                batch_size,
+            )
+            self._process_in_batches(
+                expired + [("renew_automatically", "=", False)],
+                lambda contracts: contracts.action_close(),
+                batch_size,
+            )
+
+    def _send_expiration_notification(self, template, today):
+        notified = self.filtered(
+            lambda c: c.responsible_employee_id.notification_type == "email"
         )
+        if self.env["contract.settings"].get("notification_mode") == "digest":
+            notified._queue_expiration_digests()
+        else:
+            for contract in notified:
+                template.send_mail(contract.id)
+        self.write({"last_notification_date": today})
+
+    def _queue_expiration_digests(self):
+        """Queue one mail per responsible employee listing all of their
+        contracts in ``self``. The mails are sent by the mail queue cron."""
+        email_from = (
+            self.env.company.email_formatted or self.env.user.email_formatted
+        )
+        mail_values = []
+        for user, contracts in groupby(self, key=lambda c: c.responsible_employee_id):
+            contracts = self.browse([c.id for c in contracts]).with_prefetch(
+                self._prefetch_ids
+            )
+            body = (
+                self.env["ir.qweb"]
+                .with_context(lang=user.lang)
+                ._render(
+                    "contract.contract_expiration_digest",
+                    {
+                        "user": user,
+                        "contracts": contracts.sorted("expiration_date"),
+                        "today": datetime.date.today(),
+                    },
+                )
+            )
+            mail_values.append(
+                {
+                    "subject": contracts.with_context(
+                        lang=user.lang
+                    )._get_expiration_digest_subject(),
+                    "body_html": body,
+                    "email_from": email_from,
+                    "recipient_ids": [Command.link(user.partner_id.id)],
+                    "auto_delete": True,
+                }
+            )
+        self.env["mail.mail"].sudo().create(mail_values)
+
+    def _get_expiration_digest_subject(self):
+        # translated in the language of the context, the one of the recipient
+        return _("Reminder of the expiration of %s contracts", len(self))
+
+    def _process_in_batches(self, domain, callback, batch_size):
+        """Apply ``callback`` to the contracts matching ``domain``, batch by batch.
+
+        Each batch is committed, and ``callback`` must take the processed
+        contracts out of ``domain``: an interrupted run then resumes where it
+        stopped. A failing batch is retried record by record so that a single
+        broken contract is logged and skipped instead of blocking the others.
+        """
+        failed_ids = []
+        while True:
+            contracts = self.search(
+                expression.AND([domain, [("id", "not in", failed_ids)]]),
+                limit=batch_size,
+                order="id",
+            )
+            if not contracts:
+                break
+            try:
+                with self.env.cr.savepoint():
+                    callback(contracts)
+            except Exception:
+                for contract in contracts:
+                    try:
+                        with self.env.cr.savepoint():
+                            callback(contract)
+                    except Exception:
+                        _logger.exception(
+                            "Contract %s could not be processed", contract.name
+                        )
+                        failed_ids.append(contract.id)
+            if not getattr(threading.current_thread(), "testing", False):
+                self.env.cr.commit()
 
     @api.constrains("notification_expiration_period")
     def _check_notification_expiration_period(self):
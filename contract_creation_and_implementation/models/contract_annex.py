@@ -1,4 +1,5 @@
 import math
+from collections import Counter
 
 from odoo import _, api, fields, models
 
@@ -50,21 +51,47 @@ class ContractAnnex(models.Model):
     )
 
     def unlink(self):
-        for record in self:
-            record.contract_id.contract_annex_amount -= 1
+        self.env["contract.contract"]._add_annex_amount(
+            Counter(record.contract_id.id for record in self if record.contract_id),
+            sign=-1,
+        )
+        self.env["contract.annex.total"]._add_annexes(self, sign=-1)
         return super(ContractAnnex, self).unlink()
 
-    @api.model
+    def write(self, vals):
+        totals_changed = {"contract_id", "date_conclusion", "annex_cost"} & set(vals)
+        if totals_changed:
+            self.env["contract.annex.total"]._add_annexes(self, sign=-1)
+        res = super(ContractAnnex, self).write(vals)
+        if totals_changed:
+            self.env["contract.annex.total"]._add_annexes(self)
+        return res
+
+    @api.model_create_multi
     def create(self, values_list):
-        if isinstance(values_list, dict):
-            values_list = [values_list]
+        annex_count = Counter(
+            rec_data["contract_id"]
+            for rec_data in values_list
+            if rec_data.get("contract_id")
+        )
+        # Each contract hands out a whole block of numbers at once,
+        # the last number of the block is the updated counter.
+        next_number = {
+            contract_id: amount - annex_count[contract_id] + 1
+            for contract_id, amount in self.env["contract.contract"]
+            ._add_annex_amount(annex_count)
+            .items()
+        }
         for rec_data in values_list:
+            contract_id = rec_data.get("contract_id")
+            if contract_id:
+                rec_data["annex_number"] = next_number[contract_id]
+                next_number[contract_id] += 1
             if not rec_data.get("name"):
                 rec_data["name"] = self._generate_annex_name(rec_data)
         records = super(ContractAnnex, self).create(values_list)
+        self.env["contract.annex.total"]._add_annexes(records)
         for record in records:
-            record.contract_id.contract_annex_amount += 1
-            record.annex_number = record.contract_id.contract_annex_amount
             record._set_annex_to_invoice()
         return records
 
@@ -74,13 +101,9 @@ class ContractAnnex(models.Model):
         :param data: dict
         :return: str
         """
-        # If annex_number in data, it is annex creation, and this number should be incremented by 1
-        # Otherwise it is annex modifying, and annex_number remains the same.
-        annex_number = (
-            data["annex_number"] + 1
-            if data.get("annex_number", "no_value") != "no_value"
-            else self.annex_number
-        )
+        # On creation the annex number is already reserved in data,
+        # otherwise it is annex modifying, and annex_number remains the same.
+        annex_number = data.get("annex_number") or self.annex_number
         annex_date = (
             data["date_conclusion"]
             if data.get("date_conclusion")
@@ -0,0 +1,148 @@
+from odoo import api, fields, models
+
+UPSERT_QUERY = """
+    INSERT INTO contract_annex_total (contract_id, partner_id, company_id,
+                                      currency_id, month, annex_cost, annex_count,
+                                      create_uid, create_date, write_uid, write_date)
+    SELECT c.id, c.partner_id, c.company_id, c.currency_id, d.month, d.cost,
+           d.count, %(uid)s, %(now)s, %(uid)s, %(now)s
+      FROM unnest(%(contract_ids)s::int[], %(months)s::date[],
+                  %(costs)s::numeric[], %(counts)s::int[])
+           AS d(contract_id, month, cost, count)
+      JOIN contract_contract c ON c.id = d.contract_id
+        ON CONFLICT (contract_id, month) DO UPDATE
+       SET annex_cost = contract_annex_total.annex_cost + EXCLUDED.annex_cost,
+           annex_count = contract_annex_total.annex_count + EXCLUDED.annex_count,
+           write_uid = EXCLUDED.write_uid,
+           write_date = EXCLUDED.write_date;
+    DELETE FROM contract_annex_total
+     WHERE contract_id = ANY(%(contract_ids)s) AND annex_count <= 0;
+    UPDATE contract_contract c
+       SET annex_cost_total = COALESCE(c.annex_cost_total, 0) + d.cost
+      FROM (SELECT contract_id, SUM(cost) AS cost
+              FROM unnest(%(contract_ids)s::int[], %(costs)s::numeric[])
+                   AS d(contract_id, cost)
+             GROUP BY contract_id) d
+     WHERE c.id = d.contract_id
+"""
+
+REBUILD_QUERY = """
+    DELETE FROM contract_annex_total;
+    INSERT INTO contract_annex_total (contract_id, partner_id, company_id,
+                                      currency_id, month, annex_cost, annex_count,
+                                      create_uid, create_date, write_uid, write_date)
+    SELECT c.id, c.partner_id, c.company_id, c.currency_id,
+           date_trunc('month', COALESCE(a.date_conclusion, a.create_date))::date,
+           SUM(COALESCE(a.annex_cost, 0)), COUNT(*),
+           %(uid)s, %(now)s, %(uid)s, %(now)s
+      FROM contract_annex a
+      JOIN contract_contract c ON c.id = a.contract_id
+     GROUP BY c.id, 5;
+    UPDATE contract_contract c
+       SET annex_cost_total = COALESCE((SELECT SUM(annex_cost)
+                                          FROM contract_annex_total t
+                                         WHERE t.contract_id = c.id), 0)
+"""
+
+
+class ContractAnnexTotal(models.Model):
+    """Annex costs summed per contract and month.
+
+    The rows are maintained incrementally by the annexes, so reports per
+    partner, company or period read this table instead of every annex.
+    """
+
+    _name = "contract.annex.total"
+    _description = "Contract Annex Costs per Month"
+    _order = "month desc, contract_id"
+
+    contract_id = fields.Many2one(
+        "contract.contract",
+        string="Contract",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+        index=True,
+    )
+    partner_id = fields.Many2one(
+        "res.partner", string="Partner", readonly=True, index=True
+    )
+    company_id = fields.Many2one(
+        "res.company", string="Company", readonly=True, index=True
+    )
+    currency_id = fields.Many2one("res.currency", string="Currency", readonly=True)
+    month = fields.Date(string="Month", required=True, readonly=True)
+    annex_cost = fields.Monetary(
+        string="Annex Cost", currency_field="currency_id", readonly=True
+    )
+    annex_count = fields.Integer(string="Annexes", readonly=True)
+
+    _sql_constraints = [
+        (
+            "contract_month_uniq",
+            "UNIQUE(contract_id, month)",
+            "Annex costs are summed once per contract and month.",
+        ),
+    ]
+
+    @api.model
+    def _add_annexes(self, annexes, sign=1):
+        """Add the costs of ``annexes`` to the totals, or remove them with
+        ``sign=-1``, in one round trip."""
+        rows = {}
+        for annex in annexes.filtered("contract_id"):
+            key = (
+                annex.contract_id.id,
+                (annex.date_conclusion or annex.create_date.date()).replace(day=1),
+            )
+            cost, count = rows.get(key, (0.0, 0))
+            rows[key] = (cost + sign * annex.annex_cost, count + sign)
+        if not rows:
+            return
+        self.flush_model()
+        self.env["contract.contract"].flush_model(
+            ["partner_id", "company_id", "currency_id", "annex_cost_total"]
+        )
+        self.env.cr.execute(
+            UPSERT_QUERY,
+            {
+                "contract_ids": [contract_id for contract_id, _month in rows],
+                "months": [month for _contract_id, month in rows],
+                "costs": [cost for cost, _count in rows.values()],
+                "counts": [count for _cost, count in rows.values()],
+                "uid": self.env.uid,
+                "now": fields.Datetime.now(),
+            },
+        )
+        self.invalidate_model()
+        self.env["contract.contract"].browse(
+            {contract_id for contract_id, _month in rows}
+        ).invalidate_recordset(["annex_cost_total"])
+
+    @api.model
+    def _sync_contracts(self, contracts):
+        """Copy the partner, company and currency of ``contracts`` onto
+        their totals."""
+        contracts.flush_recordset(["partner_id", "company_id", "currency_id"])
+        self.flush_model()
+        self.env.cr.execute(
+            """UPDATE contract_annex_total t
+                  SET partner_id = c.partner_id,
+                      company_id = c.company_id,
+                      currency_id = c.currency_id
+                 FROM contract_contract c
+                WHERE t.contract_id = c.id AND c.id = ANY(%s)""",
+            [contracts.ids],
+        )
+        self.invalidate_model(["partner_id", "company_id", "currency_id"])
+
+    @api.model
+    def rebuild(self):
+        """Recompute every total from the annexes."""
+        self.env["contract.annex"].flush_model()
+        self.env["contract.contract"].flush_model()
+        self.env.cr.execute(
+            REBUILD_QUERY, {"uid": self.env.uid, "now": fields.Datetime.now()}
+        )
+        self.invalidate_model()
+        self.env["contract.contract"].invalidate_model(["annex_cost_total"])
@@ -1,12 +1,116 @@
-from odoo import models, fields, api
+import hashlib
+import itertools
+import json
+import re
+from difflib import SequenceMatcher
+
+from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from odoo.tools import escape_psql
+
+# Words, spaces and punctuation, so that deltas follow the edits of a clause.
+DELTA_TOKENS = re.compile(r"\s+|\w+|[^\w\s]+")
+
+# Clause texts mix languages, so words are indexed without stemming.
+TEXT_SEARCH_CONFIG = "simple"
+TEXT_SEARCH_SCOPES = {
+    "all": "JOIN contract_line_content_rel r ON r.content_id = c.id"
+    " JOIN contract_line l ON l.id = r.line_id",
+    "current": "JOIN contract_line l ON l.current_content_id = c.id",
+    "published": "JOIN contract_line l ON l.current_content_id = c.id",
+    "signed": "JOIN contract_line l ON l.current_content_id = c.id",
+}
+# Texts of the revisions stored as deltas, rebuilt from the snapshots they
+# are chained to: copied chunks are [start, end] slices of the base text.
+DELTA_TEXTS_QUERY = """
+    WITH RECURSIVE delta_texts(id, content, compressed) AS (
+        SELECT b.id, b.content, FALSE
+          FROM contract_content b
+         WHERE b.content IS NOT NULL
+           AND EXISTS (SELECT 1 FROM contract_content d WHERE d.delta_base_id = b.id)
+        UNION ALL
+        SELECT d.id, COALESCE((
+                   SELECT string_agg(
+                              CASE json_typeof(e.chunk)
+                                  WHEN 'array' THEN substr(
+                                      t.content,
+                                      (e.chunk->>0)::int + 1,
+                                      (e.chunk->>1)::int - (e.chunk->>0)::int
+                                  )
+                                  ELSE e.chunk #>> '{}'
+                              END, '' ORDER BY e.n)
+                     FROM json_array_elements(d.delta::json)
+                          WITH ORDINALITY AS e(chunk, n)
+               ), ''), TRUE
+          FROM contract_content d
+          JOIN delta_texts t ON t.id = d.delta_base_id
+    )
+"""
+
+
+def make_delta(base, text):
+    """Return ``text`` as a JSON list of chunks: ``[start, end]`` copies a slice
+    of ``base``, a string is inserted as is."""
+    base_tokens = DELTA_TOKENS.findall(base)
+    tokens = DELTA_TOKENS.findall(text)
+    offsets = list(itertools.accumulate(map(len, base_tokens), initial=0))
+    chunks = []
+    matcher = SequenceMatcher(None, base_tokens, tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            chunks.append([offsets[i1], offsets[i2]])
+        elif j2 > j1:
+            chunks.append("".join(tokens[j1:j2]))
+    return json.dumps(chunks, ensure_ascii=False, separators=(",", ":"))
+
+
+def apply_delta(base, delta):
+    return "".join(
+        base[chunk[0] : chunk[1]] if isinstance(chunk, list) else chunk
+        for chunk in json.loads(delta)
+    )
 
 
 class ContractContent(models.Model):
     _name = "contract.content"
+    _inherit = ["contract.version.lock.mixin"]
     _description = "Contract Content"
+    _published_version_join = """
+        JOIN contract_line_content_rel r ON r.content_id = t.id
+        JOIN contract_line l ON l.id = r.line_id
+        JOIN contract_section s ON s.id = l.section_id
+        JOIN contract_version v ON v.id = s.version_id
+    """
 
-    content = fields.Text(string="Text")
+    content = fields.Text(string="Text", index="trigram")
+    full_text = fields.Text(
+        string="Full text",
+        compute="_compute_full_text",
+        help="Text of the clause, rebuilt from its delta for older revisions",
+    )
+    delta_base_id = fields.Many2one(
+        "contract.content",
+        string="Delta base",
+        readonly=True,
+        copy=False,
+        index=True,
+        ondelete="restrict",
+        help="Newer revision this one is stored as a delta against",
+    )
+    delta = fields.Text(readonly=True, copy=False, prefetch=False)
+    delta_height = fields.Integer(
+        readonly=True,
+        copy=False,
+        help="Longest chain of deltas to apply on this revision",
+    )
+    content_hash = fields.Char(
+        string="Fingerprint",
+        compute="_compute_content_hash",
+        store=True,
+        readonly=True,
+        copy=False,
+        help="SHA-256 digest of the text, used to store identical clauses once",
+    )
     line_ids = fields.Many2many(
         "contract.line",
         "contract_line_content_rel",
@@ -15,6 +119,199 @@ class ContractContent(models.Model):
         string="Сlauses",
     )
 
+    _sql_constraints = [
+        (
+            "content_hash_unique",
+            "UNIQUE(content_hash)",
+            "The same clause text is already stored.",
+        ),
+    ]
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS contract_content_content_fts_index
+                ON contract_content
+             USING gin (to_tsvector(%s::regconfig, COALESCE(content, '')))
+            """,
+            [TEXT_SEARCH_CONFIG],
+        )
+
+    @api.model
+    def search_clauses(self, query, scope="all", mode="fulltext", limit=100):
+        """Find the clauses whose text matches ``query``, best matches first.
+
+        :param query: words in web search syntax for the ``fulltext`` mode
+            ("liability cap" -penalty), a plain substring for ``substring``
+        :param scope: ``all`` searches the whole history of the clauses,
+            ``current`` only their actual text, ``published`` and ``signed``
+            the actual text of the published or signed version of contracts
+        :param mode: ``fulltext`` or ``substring`` (trigram index)
+        :return: list of dicts with ``contract_id``, ``version_id``,
+            ``line_id``, ``content_id`` and ``rank``
+
+        Revisions stored as deltas have no text for the indexes: the ``all``
+        scope rebuilds them in the query, which costs a scan of the
+        compressed history on top of the index lookups.
+        """
+        self.env.flush_all()
+        if mode == "fulltext":
+            match = (
+                "to_tsvector(%(config)s::regconfig, COALESCE({text}, ''))"
+                " @@ websearch_to_tsquery(%(config)s::regconfig, %(query)s)"
+            )
+            rank = (
+                "ts_rank(to_tsvector(%(config)s::regconfig, COALESCE(m.content, '')),"
+                " websearch_to_tsquery(%(config)s::regconfig, %(query)s))"
+            )
+        else:
+            match = "{text} ILIKE %(pattern)s"
+            rank = "similarity(m.content, %(query)s)" if self.pool.has_trigram else "1"
+        matches = "SELECT c.id, c.content FROM contract_content c WHERE {}".format(
+            match.format(text="c.content")
+        )
+        if scope == "all":
+            matches = """{} {} UNION ALL
+                SELECT t.id, t.content FROM delta_texts t
+                 WHERE t.compressed AND {}""".format(
+                DELTA_TEXTS_QUERY, matches, match.format(text="t.content")
+            )
+        version_filter = {
+            "published": "AND v.id = k.published_version_id",
+            "signed": "AND v.id = k.signed_version_id",
+        }.get(scope, "")
+        # record rules are applied in the query, so that the limit only counts
+        # the clauses of readable contracts
+        Contract = self.env["contract.contract"]
+        Contract.check_access_rights("read")
+        allowed_query, allowed_params = Contract._search([], order="id").select()
+        allowed = (
+            self.env.cr.mogrify(allowed_query, allowed_params)
+            .decode()
+            .replace("%", "%%")
+        )
+        self.env.cr.execute(
+            """
+            SELECT k.id AS contract_id, v.id AS version_id, l.id AS line_id,
+                   c.id AS content_id, {rank} AS rank
+              FROM ({matches}) m
+              JOIN contract_content c ON c.id = m.id
+              {lines}
+              JOIN contract_section s ON s.id = l.section_id
+              JOIN contract_version v ON v.id = s.version_id
+              JOIN contract_contract k ON k.id = v.contract_id
+             WHERE k.id IN ({allowed}) {version_filter}
+             ORDER BY rank DESC, l.id
+             LIMIT %(limit)s
+            """.format(
+                rank=rank,
+                matches=matches,
+                lines=TEXT_SEARCH_SCOPES[scope],
+                version_filter=version_filter,
+                allowed=allowed,
+            ),
+            {
+                "config": TEXT_SEARCH_CONFIG,
+                "query": query,
+                "pattern": "%{}%".format(escape_psql(query)),
+                "limit": limit,
+            },
+        )
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _hash_content(self, text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest() if text else False
+
+    _snapshot_interval = 10
+
+    @api.depends("content", "delta", "delta_base_id")
+    def _compute_full_text(self):
+        for record in self:
+            if record.delta_base_id:
+                record.full_text = apply_delta(
+                    record.delta_base_id.full_text or "", record.delta
+                )
+            else:
+                record.full_text = record.content
+
+    def _compress_against(self, base):
+        """Store these older revisions as deltas against ``base``.
+
+        Revisions still current on a line, already compressed, or which would
+        make a chain longer than ``_snapshot_interval`` stay full snapshots.
+        """
+        base.ensure_one()
+        self.env.flush_all()
+        self.env.cr.execute(
+            "SELECT DISTINCT current_content_id FROM contract_line"
+            " WHERE current_content_id = ANY(%s)",
+            [self.ids],
+        )
+        current_ids = {row[0] for row in self.env.cr.fetchall()}
+        base_text = base.content or ""
+        base_height = base.delta_height
+        for record in self - base:
+            if (
+                record.id in current_ids
+                or record.delta_base_id
+                or not record.content
+                or record.delta_height + 1 > self._snapshot_interval
+            ):
+                continue
+            delta = make_delta(base_text, record.content)
+            if len(delta) >= len(record.content):
+                continue
+            # storage only: the text is unchanged, no constraint applies
+            self.env.cr.execute(
+                "UPDATE contract_content"
+                " SET content = NULL, delta = %s, delta_base_id = %s WHERE id = %s",
+                [delta, base.id, record.id],
+            )
+            base_height = max(base_height, record.delta_height + 1)
+        if base_height != base.delta_height:
+            self.env.cr.execute(
+                "UPDATE contract_content SET delta_height = %s WHERE id = %s",
+                [base_height, base.id],
+            )
+        (self | base).invalidate_recordset()
+
+    def _expand_delta(self):
+        """Store the full text of the revisions which are current again."""
+        for record in self.filtered("delta_base_id"):
+            self.env.cr.execute(
+                "UPDATE contract_content"
+                " SET content = %s, delta = NULL, delta_base_id = NULL WHERE id = %s",
+                [record.full_text, record.id],
+            )
+            record.invalidate_recordset()
+
+    @api.depends("content")
+    def _compute_content_hash(self):
+        for record in self:
+            record.content_hash = self._hash_content(record.content)
+
+    @api.model
+    def _find_or_create(self, text):
+        """Return the content record holding ``text``, creating it if needed."""
+        return self._find_or_create_multi([text])[text]
+
+    @api.model
+    def _find_or_create_multi(self, texts):
+        """Return a dict {text: content record} for ``texts``, looking them up
+        with one index probe and creating the missing ones in one batch."""
+        hashes = {text: self._hash_content(text) for text in set(texts)}
+        existing = {
+            content.content_hash: content
+            for content in self.search(
+                [("content_hash", "in", [h for h in hashes.values() if h])]
+            )
+        }
+        missing = [text for text, h in hashes.items() if h not in existing]
+        for content in self.create([{"content": text} for text in missing]):
+            existing.setdefault(content.content_hash, content)
+        return {text: existing[h] for text, h in hashes.items()}
+
     @api.model_create_multi
     def create(self, vals):
         new_content = super(ContractContent, self).create(vals)
@@ -24,17 +321,33 @@ class ContractContent(models.Model):
 
     @api.constrains("content", "line_ids")
     def _check_published_version(self):
-        for record in self:
-            if any(line.section_id.version_id.is_published for line in record.line_ids):
-                raise UserError(
-                    _("Cannot modify the content of a published contract version.")
-                )
+        self._raise_if_published_version()
+
+    def unlink(self):
+        # the revisions stored against the deleted ones need their full text
+        self.search(
+            [("delta_base_id", "in", self.ids), ("id", "not in", self.ids)]
+        )._expand_delta()
+        self.flush_model()
+        self.env.cr.execute(
+            "UPDATE contract_content SET delta_base_id = NULL WHERE id = ANY(%s)",
+            [self.ids],
+        )
+        self.invalidate_recordset(["delta_base_id"])
+        return super(ContractContent, self).unlink()
 
     def write(self, vals):
         if "content" in vals:
-            new_content = self._create_new_content(vals)
-            for rec in self:
-                rec.line_ids.write({"current_content_id": new_content.id})
+            # a text is shared by the clauses of unrelated contracts, only the
+            # line it is edited from gets the new one
+            lines = self.line_ids & self.env["contract.line"].browse(
+                self.env.context.get("active_id", False)
+            )
+            if not lines:
+                raise UserError(
+                    _("A clause text is edited from the contract line using it.")
+                )
+            lines._set_content(vals["content"])
             return True
         return super(ContractContent, self).write(vals)
 
@@ -43,7 +356,3 @@ class ContractContent(models.Model):
         line_id = self.env.context.get("active_id", False)
         self.env["contract.line"].browse(line_id).write({"current_content_id": self.id})
 
-    def _create_new_content(self, vals):
-        new_vals = vals.copy()
-        new_vals["line_ids"] = [(6, 0, self.line_ids.ids)]
-        return self.create(new_vals)
@@ -0,0 +1,173 @@
+"""Streaming writers for contract documents.
+
+Writers take an iterable of ``(kind, number, text)`` parts, where ``kind`` is
+``"section"`` or ``"line"``, and yield the file as chunks of bytes, so that
+neither the contract nor the document is held in memory.
+"""
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+EXPORT_FORMATS = {
+    "txt": ("text/plain; charset=utf-8", "txt"),
+    "docx": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "docx",
+    ),
+    "odt": ("application/vnd.oasis.opendocument.text", "odt"),
+}
+
+# characters which are not allowed in XML 1.0 documents
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    "</Relationships>"
+)
+DOCX_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body>"
+)
+DOCX_FOOTER = "<w:sectPr/></w:body></w:document>"
+
+ODT_MANIFEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0"'
+    ' manifest:version="1.2">'
+    '<manifest:file-entry manifest:full-path="/"'
+    ' manifest:media-type="application/vnd.oasis.opendocument.text"/>'
+    '<manifest:file-entry manifest:full-path="content.xml"'
+    ' manifest:media-type="text/xml"/>'
+    "</manifest:manifest>"
+)
+ODT_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+    ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">'
+    "<office:body><office:text>"
+)
+ODT_FOOTER = "</office:text></office:body></office:document-content>"
+
+
+class _Pipe:
+    """Write-only file object drained by the generator producing the file."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xml_text(text):
+    return escape(_XML_INVALID.sub("", text or ""))
+
+
+def _join(number, text):
+    return " ".join(value for value in (number, text) if value)
+
+
+def iter_txt(parts):
+    for kind, number, text in parts:
+        prefix = "\n" if kind == "section" else ""
+        yield "{}{}\n".format(prefix, _join(number, text)).encode("utf-8")
+
+
+def _docx_paragraph(kind, number, text):
+    run_properties = "<w:rPr><w:b/></w:rPr>" if kind == "section" else ""
+    runs = "<w:br/>".join(
+        '<w:t xml:space="preserve">{}</w:t>'.format(_xml_text(line))
+        for line in _join(number, text).split("\n")
+    )
+    return "<w:p><w:r>{}{}</w:r></w:p>".format(run_properties, runs)
+
+
+def _odt_paragraph(kind, number, text):
+    content = "<text:line-break/>".join(
+        _xml_text(line) for line in _join(number, text).split("\n")
+    )
+    if kind == "section":
+        return '<text:h text:outline-level="1">{}</text:h>'.format(content)
+    return "<text:p>{}</text:p>".format(content)
+
+
+def _iter_zip_document(parts, static_files, body_name, header, footer, paragraph):
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data, compression in static_files:
+            archive.writestr(name, data, compress_type=compression)
+        with archive.open(body_name, "w", force_zip64=True) as body:
+            body.write(header.encode("utf-8"))
+            for part in parts:
+                body.write(paragraph(*part).encode("utf-8"))
+                yield pipe.drain()
+            body.write(footer.encode("utf-8"))
+    yield pipe.drain()
+
+
+def iter_docx(parts):
+    return _iter_zip_document(
+        parts,
+        [
+            ("[Content_Types].xml", DOCX_CONTENT_TYPES, zipfile.ZIP_DEFLATED),
+            ("_rels/.rels", DOCX_RELS, zipfile.ZIP_DEFLATED),
+        ],
+        "word/document.xml",
+        DOCX_HEADER,
+        DOCX_FOOTER,
+        _docx_paragraph,
+    )
+
+
+def iter_odt(parts):
+    return _iter_zip_document(
+        parts,
+        [
+            # must be the first entry and not compressed
+            ("mimetype", EXPORT_FORMATS["odt"][0], zipfile.ZIP_STORED),
+            ("META-INF/manifest.xml", ODT_MANIFEST, zipfile.ZIP_DEFLATED),
+        ],
+        "content.xml",
+        ODT_HEADER,
+        ODT_FOOTER,
+        _odt_paragraph,
+    )
+
+
+WRITERS = {"txt": iter_txt, "docx": iter_docx, "odt": iter_odt}
+
+
+def iter_archive(documents):
+    """Yield a zip archive of ``documents``, an iterable of
+    ``(file name, iterable of bytes)``."""
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, "w", zipfile.ZIP_DEFLATED) as archive:
+        for file_name, chunks in documents:
+            with archive.open(file_name, "w", force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    yield pipe.drain()
+    yield pipe.drain()
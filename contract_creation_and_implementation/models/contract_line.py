@@ -1,17 +1,33 @@
-from odoo import models, fields, api, _
-from odoo.exceptions import UserError
+from odoo import models, fields, api, _, _lt
 
 
 class ContractLine(models.Model):
     """Хранит информацию о пунктах(абзацах) договора."""
 
     _name = "contract.line"
+    _inherit = ["contract.version.lock.mixin", "contract.sequence.mixin"]
     _description = "Contract Line"
     _order = "sequence"
+    _sequence_parent = "section_id"
+    _published_version_join = """
+        JOIN contract_section s ON s.id = t.section_id
+        JOIN contract_version v ON v.id = s.version_id
+    """
+    _published_version_error = _lt(
+        "Cannot modify a line of a published contract version."
+    )
 
     section_id = fields.Many2one("contract.section", string="Section")
     contract_id = fields.Many2one("contract.contract", string="Contract")
     number = fields.Char(string="Number")
+    origin_id = fields.Many2one(
+        "contract.line",
+        string="Original Line",
+        help="Line of an earlier version this one was copied from",
+        readonly=True,
+        copy=False,
+        index=True,
+    )
     sequence = fields.Integer()
     create_date = fields.Datetime(string="Creation date")
     content_ids = fields.Many2many(
@@ -22,7 +38,9 @@ class ContractLine(models.Model):
         string="Content",
         copy=False,
     )
-    current_content_id = fields.Many2one("contract.content", string="Actual content")
+    current_content_id = fields.Many2one(
+        "contract.content", string="Actual content", index=True
+    )
     current_content_text = fields.Text(
         string="Actual content text",
         related="current_content_id.content",
@@ -33,17 +51,48 @@ class ContractLine(models.Model):
         string="History Count", compute="_compute_history_count", store=False
     )
 
-    @api.model
-    def create(self, vals):
-        section = self.env["contract.section"].browse(vals.get("section_id"))
-        vals.update({"sequence": len(section.line_ids.ids)})
-        res = super(ContractLine, self).create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._assign_sequences(vals_list)
+        lines = super(ContractLine, self).create(vals_list)
+        lines.current_content_id._expand_delta()
+        return lines
+
+    def write(self, vals):
+        if not vals.get("current_content_id"):
+            return super(ContractLine, self).write(vals)
+        previous = self.current_content_id
+        res = super(ContractLine, self).write(vals)
+        current = self.env["contract.content"].browse(vals["current_content_id"])
+        current._expand_delta()
+        (previous - current)._compress_against(current)
         return res
 
+    def _set_content(self, text):
+        """Make ``text`` the actual content of these lines only, keeping the
+        previous one in their history."""
+        content = self.env["contract.content"]._find_or_create(text)
+        self.write(
+            {
+                "content_ids": [(4, content.id)],
+                "current_content_id": content.id,
+            }
+        )
+        return content
+
     @api.depends("content_ids")
     def _compute_history_count(self):
+        # contents are shared between lines: count the relation rows of these
+        # lines only, grouping on contract.content would count every sharer
+        self.flush_recordset(["content_ids"])
+        self.env.cr.execute(
+            """SELECT line_id, COUNT(*) FROM contract_line_content_rel
+                WHERE line_id = ANY(%s) GROUP BY line_id""",
+            [self.ids],
+        )
+        counts = dict(self.env.cr.fetchall())
         for record in self:
-            record.history_count = len(record.content_ids)
+            record.history_count = counts.get(record.id, 0)
 
     @api.returns("self", lambda value: value.id)
     def copy(self, default=None):
@@ -59,11 +108,7 @@ class ContractLine(models.Model):
 
     @api.constrains("section_id", "contract_id", "number", "content_ids")
     def _check_published_version(self):
-        for record in self:
-            if record.section_id.version_id.is_published:
-                raise UserError(
-                    _("Cannot modify a line of a published contract version.")
-                )
+        self._raise_if_published_version()
 
     def button_delete_content(self):
         self.ensure_one()
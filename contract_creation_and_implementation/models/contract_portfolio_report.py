@@ -0,0 +1,102 @@
+from odoo import api, fields, models
+
+
+class ContractPortfolioReport(models.Model):
+    """Contracts with their version and annex figures, for dashboards.
+
+    The report is a materialized view: grouping reads stored columns of one
+    table instead of computing fields on every contract. It is refreshed by
+    a cron, so its figures are as recent as the last refresh.
+    """
+
+    _name = "contract.portfolio.report"
+    _description = "Contract Portfolio Analysis"
+    _auto = False
+    _order = "expiration_date, id"
+
+    name = fields.Char(string="Contract", readonly=True)
+    contract_id = fields.Many2one("contract.contract", string="Contract", readonly=True)
+    state = fields.Selection(
+        [
+            ("draft", "New"),
+            ("sign", "Signed"),
+            ("close", "Closed"),
+        ],
+        string="Status",
+        readonly=True,
+    )
+    type = fields.Selection(
+        [
+            ("with_customer", "With customer"),
+            ("with_vendor", "With vendor"),
+        ],
+        string="Contract type",
+        readonly=True,
+    )
+    company_id = fields.Many2one("res.company", string="Company", readonly=True)
+    partner_id = fields.Many2one("res.partner", string="Partner", readonly=True)
+    responsible_employee_id = fields.Many2one(
+        "res.users", string="Responsible employee", readonly=True
+    )
+    currency_id = fields.Many2one("res.currency", string="Currency", readonly=True)
+    date_conclusion = fields.Date(string="Signing date", readonly=True)
+    expiration_date = fields.Date(string="Expiration date", readonly=True)
+    next_action_date = fields.Date(string="Next action date", readonly=True)
+    renew_automatically = fields.Boolean(string="Renewed automatically", readonly=True)
+    contract_count = fields.Integer(string="Contracts", readonly=True)
+    version_count = fields.Integer(string="Versions", readonly=True)
+    draft_version_count = fields.Integer(string="Draft versions", readonly=True)
+    has_published_version = fields.Boolean(string="Published version", readonly=True)
+    annex_count = fields.Integer(string="Annexes", readonly=True)
+    annex_cost_total = fields.Monetary(
+        string="Annexes Cost", currency_field="currency_id", readonly=True
+    )
+
+    def _query(self):
+        return """
+            SELECT c.id, c.id AS contract_id, c.name, c.state, c.type,
+                   c.company_id, c.partner_id, c.responsible_employee_id,
+                   c.currency_id, c.date_conclusion, c.expiration_date,
+                   c.next_action_date,
+                   COALESCE(c.renew_automatically, false) AS renew_automatically,
+                   1 AS contract_count,
+                   COALESCE(v.version_count, 0) AS version_count,
+                   COALESCE(v.draft_version_count, 0) AS draft_version_count,
+                   c.published_version_id IS NOT NULL AS has_published_version,
+                   COALESCE(a.annex_count, 0) AS annex_count,
+                   COALESCE(c.annex_cost_total, 0) AS annex_cost_total
+              FROM contract_contract c
+              LEFT JOIN (SELECT contract_id, COUNT(*) AS version_count,
+                                COUNT(*) FILTER (WHERE NOT COALESCE(is_published, false))
+                                    AS draft_version_count
+                           FROM contract_version
+                          GROUP BY contract_id) v ON v.contract_id = c.id
+              LEFT JOIN (SELECT contract_id, SUM(annex_count) AS annex_count
+                           FROM contract_annex_total
+                          GROUP BY contract_id) a ON a.contract_id = c.id
+        """
+
+    def init(self):
+        self.env.cr.execute(
+            "DROP MATERIALIZED VIEW IF EXISTS {table}".format(table=self._table)
+        )
+        self.env.cr.execute(
+            """CREATE MATERIALIZED VIEW {table} AS ({query});
+               CREATE UNIQUE INDEX {table}_id_index ON {table} (id);
+               CREATE INDEX {table}_state_index ON {table} (state, type);
+               CREATE INDEX {table}_expiration_date_index
+                   ON {table} (expiration_date);""".format(
+                table=self._table, query=self._query()
+            )
+        )
+
+    @api.model
+    def refresh(self):
+        """Refresh the report without locking out its readers."""
+        self.env["contract.contract"].flush_model()
+        self.env["contract.version"].flush_model(["contract_id", "is_published"])
+        self.env["contract.annex.total"].flush_model()
+        self.env.cr.execute(
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY {table}".format(table=self._table)
+        )
+        self.invalidate_model()
@@ -0,0 +1,96 @@
+import functools
+import logging
+import threading
+import time
+
+import psycopg2
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+def profiled(action):
+    """Record queries and timings of the decorated method in
+    ``contract.profile.log`` when the ``profiling`` setting is on."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.env["contract.profile.log"]._is_profiling_enabled():
+                return method(self, *args, **kwargs)
+            thread = threading.current_thread()
+            # counters maintained by the cursor, only set by http requests and crons
+            for counter in ("query_count", "query_time"):
+                if not hasattr(thread, counter):
+                    setattr(thread, counter, 0)
+            query_count = thread.query_count
+            query_time = thread.query_time
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.env["contract.profile.log"]._log_call(
+                    action,
+                    self,
+                    queries=thread.query_count - query_count,
+                    duration=time.perf_counter() - start,
+                    sql_duration=thread.query_time - query_time,
+                )
+
+        return wrapper
+
+    return decorator
+
+
+class ContractProfileLog(models.Model):
+    _name = "contract.profile.log"
+    _description = "Contract Action Profile"
+    _order = "id desc"
+
+    action = fields.Char(string="Action", required=True, index=True, readonly=True)
+    model = fields.Char(string="Model", readonly=True)
+    user_id = fields.Many2one("res.users", string="User", readonly=True)
+    record_count = fields.Integer(string="Records", readonly=True, group_operator="sum")
+    query_count = fields.Integer(string="Queries", readonly=True, group_operator="avg")
+    duration = fields.Float(
+        string="Total time, ms", readonly=True, digits=(16, 1), group_operator="avg"
+    )
+    sql_duration = fields.Float(
+        string="SQL time, ms", readonly=True, digits=(16, 1), group_operator="avg"
+    )
+    python_duration = fields.Float(
+        string="Python time, ms", readonly=True, digits=(16, 1), group_operator="avg"
+    )
+    is_slow = fields.Boolean(string="Slow", readonly=True, index=True)
+
+    @api.model
+    def _is_profiling_enabled(self):
+        return self.env["contract.settings"].get("profiling")
+
+    @api.model
+    def _get_slow_threshold(self):
+        return self.env["contract.settings"].get("profiling_slow_threshold")
+
+    @api.model
+    def _log_call(self, action, records, queries, duration, sql_duration):
+        values = {
+            "action": action,
+            "model": records._name,
+            "user_id": self.env.uid,
+            "record_count": len(records),
+            "query_count": queries,
+            "duration": duration * 1000,
+            "sql_duration": sql_duration * 1000,
+            "python_duration": max(duration - sql_duration, 0) * 1000,
+        }
+        values["is_slow"] = values["duration"] >= self._get_slow_threshold()
+        log = _logger.warning if values["is_slow"] else _logger.info
+        log("Contract action profile: %s", values)
+        # in the transaction of the action: rolled back with it, the log line
+        # above is then the only trace of the call
+        try:
+            with self.env.cr.savepoint():
+                self.sudo().create(values)
+        except psycopg2.Error:
+            _logger.warning("Contract action profile not recorded", exc_info=True)
@@ -1,11 +1,16 @@
-from odoo import fields, models, api, _
-from odoo.exceptions import UserError
+from odoo import fields, models, api, _, _lt
 
 
 class ContractSection(models.Model):
     _name = "contract.section"
+    _inherit = ["contract.version.lock.mixin", "contract.sequence.mixin"]
     _description = "Contract Section"
     _order = "sequence"
+    _sequence_parent = "version_id"
+    _published_version_join = "JOIN contract_version v ON v.id = t.version_id"
+    _published_version_error = _lt(
+        "Cannot modify a section of a published contract version."
+    )
 
     name = fields.Char(string="Name")
     number = fields.Char(string="Section Number")
@@ -13,21 +18,23 @@ class ContractSection(models.Model):
     contract_id = fields.Many2one("contract.contract", string="Contract")
     line_ids = fields.One2many("contract.line", "section_id", string="Section text")
     version_id = fields.Many2one("contract.version", string="Contract Version")
+    origin_id = fields.Many2one(
+        "contract.section",
+        string="Original Section",
+        help="Section of an earlier version this one was copied from",
+        readonly=True,
+        copy=False,
+        index=True,
+    )
 
-    @api.model
-    def create(self, vals):
-        version = self.env["contract.version"].browse(vals.get("version_id"))
-        vals.update({"sequence": version.sections_number})
-        res = super(ContractSection, self).create(vals)
-        return res
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._assign_sequences(vals_list)
+        return super(ContractSection, self).create(vals_list)
 
     @api.constrains("name", "version_id", "line_ids", "contract_id")
     def _check_published_version(self):
-        for record in self:
-            if record.version_id.is_published:
-                raise UserError(
-                    _("Cannot modify a section of a published contract version.")
-                )
+        self._raise_if_published_version()
 
     def button_create_clause(self):
         self.ensure_one()
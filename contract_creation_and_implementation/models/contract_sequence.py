@@ -0,0 +1,134 @@
+from odoo import api, models
+from odoo.tools import create_index
+
+
+class ContractSequenceMixin(models.AbstractModel):
+    """Gap-based ordering of records inside their parent.
+
+    Siblings are numbered ``_sequence_gap`` apart, so that a record can be
+    appended or inserted between two others without renumbering them. When
+    a gap is exhausted, the parent is renumbered with a single statement.
+    """
+
+    _name = "contract.sequence.mixin"
+    _description = "Contract Sequence"
+
+    _sequence_parent = None
+    _sequence_gap = 1024
+
+    def init(self):
+        if self._sequence_parent:
+            create_index(
+                self.env.cr,
+                "{}_{}_sequence_index".format(self._table, self._sequence_parent),
+                self._table,
+                ['"{}"'.format(self._sequence_parent), "sequence"],
+            )
+
+    def _lock_sequence_parents(self, parent_ids):
+        """Serialize the numbering of concurrent transactions per parent."""
+        parent_table = self.env[self._fields[self._sequence_parent].comodel_name]._table
+        self.env.cr.execute(
+            'SELECT id FROM "{}" WHERE id = ANY(%s) ORDER BY id FOR UPDATE'.format(
+                parent_table
+            ),
+            [list(parent_ids)],
+        )
+
+    @api.model
+    def _assign_sequences(self, vals_list):
+        """Append records created without an explicit sequence after their
+        last sibling, reading only the current maximum from the index."""
+        parent = self._sequence_parent
+        parent_ids = {
+            vals[parent]
+            for vals in vals_list
+            if vals.get(parent) and vals.get("sequence") is None
+        }
+        if not parent_ids:
+            return
+        self._lock_sequence_parents(parent_ids)
+        self.flush_model([parent, "sequence"])
+        self.env.cr.execute(
+            'SELECT "{parent}", MAX(sequence) FROM "{table}"'
+            ' WHERE "{parent}" = ANY(%s) GROUP BY 1'.format(
+                parent=parent, table=self._table
+            ),
+            [list(parent_ids)],
+        )
+        last_sequence = dict.fromkeys(parent_ids, 0)
+        last_sequence.update(
+            {parent_id: sequence or 0 for parent_id, sequence in self.env.cr.fetchall()}
+        )
+        for vals in vals_list:
+            if vals.get(parent) in parent_ids and vals.get("sequence") is None:
+                last_sequence[vals[parent]] += self._sequence_gap
+                vals["sequence"] = last_sequence[vals[parent]]
+
+    def move_to(self, parent_id, after_id=None):
+        """Move these records, in their current order, into ``parent_id``
+        right after the sibling ``after_id`` (at the beginning if None)."""
+        if not self:
+            return True
+        self._check_published_version()
+        parent = self._sequence_parent
+        self._lock_sequence_parents([parent_id])
+        self.env.flush_all()
+        cr = self.env.cr
+        moved_ids = self.sorted(lambda record: (record.sequence, record.id)).ids
+        count = len(moved_ids)
+
+        cr.execute(
+            'SELECT sequence FROM "{}" WHERE id = %s'.format(self._table), [after_id]
+        )
+        low = (cr.fetchone() or [0])[0] if after_id else 0
+        cr.execute(
+            'SELECT MIN(sequence) FROM "{table}" WHERE "{parent}" = %s'
+            " AND sequence > %s AND id != ALL(%s)".format(
+                table=self._table, parent=parent
+            ),
+            [parent_id, low, moved_ids],
+        )
+        high = cr.fetchone()[0]
+        if high is None:
+            high = low + self._sequence_gap * (count + 1)
+        elif high - low <= count:
+            # no room left: renumber the siblings, leaving a hole for the moved ones
+            cr.execute(
+                """
+                UPDATE "{table}" t
+                   SET sequence = (r.position
+                                   + CASE WHEN r.sequence > %(low)s
+                                          THEN %(count)s ELSE 0 END
+                                  ) * %(gap)s
+                  FROM (SELECT id, sequence,
+                               row_number() OVER (ORDER BY sequence, id) AS position
+                          FROM "{table}"
+                         WHERE "{parent}" = %(parent_id)s AND id != ALL(%(moved)s)) r
+                 WHERE t.id = r.id
+             RETURNING CASE WHEN r.sequence > %(low)s THEN NULL ELSE t.sequence END
+                """.format(table=self._table, parent=parent),
+                {
+                    "low": low,
+                    "count": count,
+                    "gap": self._sequence_gap,
+                    "parent_id": parent_id,
+                    "moved": moved_ids,
+                },
+            )
+            low = max([row[0] for row in cr.fetchall() if row[0] is not None] or [0])
+            high = low + self._sequence_gap * (count + 1)
+        step = (high - low) // (count + 1)
+        cr.execute(
+            """
+            UPDATE "{table}" t
+               SET "{parent}" = %s, sequence = %s + m.position * %s
+              FROM unnest(%s::int[]) WITH ORDINALITY AS m(id, position)
+             WHERE t.id = m.id
+            """.format(table=self._table, parent=parent),
+            [parent_id, low, step, moved_ids],
+        )
+        self.invalidate_model([parent, "sequence"])
+        self.env[self._fields[parent].comodel_name].invalidate_model()
+        self._check_published_version()
+        return True
@@ -0,0 +1,62 @@
+from odoo import api, models, tools
+
+# parameter key (without the "contract." prefix): (type, default)
+CONTRACT_SETTINGS = {
+    "allow_not_signed_contract": (bool, False),
+    "notification_expiration_period": (int, 1),
+    "renew_period": (int, 1),
+    "renew_period_type": (str, "days"),
+    "notification_mode": (str, "contract"),
+    "profiling": (bool, False),
+    "profiling_slow_threshold": (int, 1000),
+}
+
+
+def _parse(value_type, value, default):
+    if value is None:
+        return default
+    if value_type is bool:
+        return value.strip().lower() in ("1", "true")
+    try:
+        return value_type(value)
+    except ValueError:
+        return default
+
+
+class ContractSettings(models.AbstractModel):
+    """Typed access to the contract parameters stored in ir.config_parameter.
+
+    Values are read in one query and memoised per registry, so computes and
+    defaults do not query the configuration.
+    """
+
+    _name = "contract.settings"
+    _description = "Contract Settings"
+
+    @api.model
+    @tools.ormcache()
+    def _get_settings(self):
+        params = dict(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .search([("key", "in", ["contract." + key for key in CONTRACT_SETTINGS])])
+            .mapped(lambda param: (param.key[len("contract.") :], param.value))
+        )
+        return {
+            key: _parse(value_type, params.get(key), default)
+            for key, (value_type, default) in CONTRACT_SETTINGS.items()
+        }
+
+    @api.model
+    def get(self, key):
+        return self._get_settings()[key]
+
+    @api.model
+    def set(self, values):
+        ir_config = self.env["ir.config_parameter"].sudo()
+        for key, value in values.items():
+            value_type, default = CONTRACT_SETTINGS[key]
+            if value_type is bool:
+                value = bool(value)
+            ir_config.set_param("contract." + key, value)
+        self.clear_caches()
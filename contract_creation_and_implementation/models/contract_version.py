@@ -1,5 +1,158 @@
+import difflib
+
 from odoo import fields, models, api, _
 from odoo.exceptions import UserError
+from odoo.models import LOG_ACCESS_COLUMNS
+from odoo.tools import split_every
+
+from .contract_document import EXPORT_FORMATS, WRITERS, iter_archive
+from .contract_profile import profiled
+
+# Sections and lines are compared on the previous sibling kept in both
+# versions, not on their sequence: renumbering the siblings, inserting or
+# removing one does not make the others "moved". A moved record and the one
+# it is now placed before are both reported.
+DIFF_SECTION_QUERY = """
+    WITH old AS (
+        SELECT COALESCE(origin_id, id) AS key, id, name, number, sequence
+          FROM contract_section
+         WHERE version_id = %(base)s
+    ), new AS (
+        SELECT COALESCE(origin_id, id) AS key, id, name, number, sequence
+          FROM contract_section
+         WHERE version_id = %(version)s
+    ), old_position AS (
+        SELECT key, LAG(key) OVER (ORDER BY sequence, id) AS previous_key
+          FROM old
+         WHERE key IN (SELECT key FROM new)
+    ), new_position AS (
+        SELECT key, LAG(key) OVER (ORDER BY sequence, id) AS previous_key
+          FROM new
+         WHERE key IN (SELECT key FROM old)
+    )
+    SELECT COALESCE(new.key, old.key) AS key,
+           CASE WHEN old.id IS NULL THEN 'added'
+                WHEN new.id IS NULL THEN 'removed'
+                WHEN old.name IS DISTINCT FROM new.name
+                  OR old.number IS DISTINCT FROM new.number THEN 'changed'
+                ELSE 'moved'
+           END AS change,
+           old.id AS old_id, new.id AS new_id,
+           COALESCE(new.number, old.number) AS number,
+           COALESCE(new.name, old.name) AS name,
+           NULL::int AS old_content_id, NULL::int AS new_content_id
+      FROM old FULL JOIN new ON new.key = old.key
+      LEFT JOIN old_position op ON op.key = old.key
+      LEFT JOIN new_position np ON np.key = new.key
+     WHERE COALESCE(new.key, old.key) > %(after)s
+       AND (old.id IS NULL OR new.id IS NULL
+            OR old.name IS DISTINCT FROM new.name
+            OR old.number IS DISTINCT FROM new.number
+            OR op.previous_key IS DISTINCT FROM np.previous_key)
+     ORDER BY 1
+     LIMIT %(limit)s
+"""
+
+DIFF_LINE_QUERY = """
+    WITH old AS (
+        SELECT COALESCE(l.origin_id, l.id) AS key, l.id, l.number, l.sequence,
+               l.current_content_id, COALESCE(s.origin_id, s.id) AS section_key
+          FROM contract_line l
+          JOIN contract_section s ON s.id = l.section_id
+         WHERE s.version_id = %(base)s
+    ), new AS (
+        SELECT COALESCE(l.origin_id, l.id) AS key, l.id, l.number, l.sequence,
+               l.current_content_id, COALESCE(s.origin_id, s.id) AS section_key
+          FROM contract_line l
+          JOIN contract_section s ON s.id = l.section_id
+         WHERE s.version_id = %(version)s
+    ), old_position AS (
+        SELECT key, LAG(key) OVER (PARTITION BY section_key
+                                   ORDER BY sequence, id) AS previous_key
+          FROM old
+         WHERE (key, section_key) IN (SELECT key, section_key FROM new)
+    ), new_position AS (
+        SELECT key, LAG(key) OVER (PARTITION BY section_key
+                                   ORDER BY sequence, id) AS previous_key
+          FROM new
+         WHERE (key, section_key) IN (SELECT key, section_key FROM old)
+    )
+    SELECT COALESCE(new.key, old.key) AS key,
+           CASE WHEN old.id IS NULL THEN 'added'
+                WHEN new.id IS NULL THEN 'removed'
+                WHEN old.current_content_id IS DISTINCT FROM new.current_content_id
+                  OR old.number IS DISTINCT FROM new.number THEN 'changed'
+                ELSE 'moved'
+           END AS change,
+           old.id AS old_id, new.id AS new_id,
+           COALESCE(new.number, old.number) AS number,
+           NULL AS name,
+           old.current_content_id AS old_content_id,
+           new.current_content_id AS new_content_id
+      FROM old FULL JOIN new ON new.key = old.key
+      LEFT JOIN old_position op ON op.key = old.key
+      LEFT JOIN new_position np ON np.key = new.key
+     WHERE COALESCE(new.key, old.key) > %(after)s
+       AND (old.id IS NULL OR new.id IS NULL
+            OR old.current_content_id IS DISTINCT FROM new.current_content_id
+            OR old.number IS DISTINCT FROM new.number
+            OR old.section_key IS DISTINCT FROM new.section_key
+            OR op.previous_key IS DISTINCT FROM np.previous_key)
+     ORDER BY 1
+     LIMIT %(limit)s
+"""
+
+# Selectable fields of the tree levels: key in the result: SQL expression
+TREE_FIELDS = {
+    "version": {
+        "name": "v.name",
+        "version_number": "v.version_number",
+        "contract_id": "v.contract_id",
+        "is_published": "v.is_published",
+        "is_signed": "v.is_signed",
+    },
+    "section": {
+        "name": "s.name",
+        "number": "s.number",
+        "sequence": "s.sequence",
+    },
+    "line": {
+        "number": "l.number",
+        "sequence": "l.sequence",
+        "content_id": "l.current_content_id",
+        # current contents are always stored in full
+        "text": "c.content",
+        "history_ids": "ARRAY(SELECT content_id FROM contract_line_content_rel"
+        " WHERE line_id = l.id ORDER BY content_id DESC)",
+    },
+}
+
+TREE_QUERY = """
+    SELECT json_build_object(
+               'id', v.id{version},
+               'sections', COALESCE((
+                   SELECT json_agg(json_build_object(
+                              'id', s.id{section},
+                              'lines', COALESCE((
+                                  SELECT json_agg(json_build_object('id', l.id{line})
+                                                  ORDER BY l.sequence, l.id)
+                                    FROM contract_line l
+                                    LEFT JOIN contract_content c
+                                           ON c.id = l.current_content_id
+                                   WHERE l.section_id = s.id), '[]'::json))
+                          ORDER BY s.sequence, s.id)
+                     FROM (SELECT *
+                             FROM contract_section
+                            WHERE version_id = v.id
+                              AND (%(after)s::int IS NULL
+                                   OR (sequence, id) > (SELECT sequence, id
+                                                          FROM contract_section
+                                                         WHERE id = %(after)s))
+                            ORDER BY sequence, id
+                            LIMIT %(limit)s) s), '[]'::json))
+      FROM contract_version v
+     WHERE v.id = %(version)s
+"""
 
 
 class ContractVersion(models.Model):
@@ -18,6 +171,11 @@ class ContractVersion(models.Model):
     is_published = fields.Boolean(string="Published")
     is_signed = fields.Boolean(string="Signed", default=False)
 
+    document_html = fields.Html(
+        string="Document", compute="_compute_document_html", sanitize=False
+    )
+    render_ids = fields.One2many("contract.version.render", "version_id")
+
     @api.depends("contract_id.name", "version_number")
     def _compute_name(self):
         for record in self:
@@ -25,6 +183,69 @@ class ContractVersion(models.Model):
                 record.contract_id.name, record.version_number
             )
 
+    def _compute_document_html(self):
+        render = self.env["contract.version.render"]
+        for record in self:
+            record.document_html = render._get_html(record) if record.id else False
+
+    def _render_document(self):
+        self.ensure_one()
+        return self.env["ir.qweb"]._render(
+            "contract.contract_version_document", {"version": self}
+        )
+
+    def _iter_document_parts(self, batch_size=1000):
+        """Yield the sections and lines of this version as document parts.
+
+        Lines are read ``batch_size`` at a time and dropped from the cache
+        once written, so memory does not grow with the size of the contract.
+        """
+        self.ensure_one()
+        Line = self.env["contract.line"]
+        for section in self.section_ids:
+            yield ("section", section.number, section.name)
+            line_ids = Line.search([("section_id", "=", section.id)]).ids
+            for batch_ids in split_every(batch_size, line_ids):
+                lines = Line.browse(batch_ids)
+                for line in lines:
+                    yield ("line", line.number, line.current_content_text)
+                lines.current_content_id.invalidate_recordset()
+                lines.invalidate_recordset()
+
+    def export_document(self, export_format="txt", batch_size=1000):
+        """Return a generator of the bytes of this version as a document."""
+        self.ensure_one()
+        return WRITERS[export_format](self._iter_document_parts(batch_size))
+
+    def _get_document_file_name(self, export_format):
+        return "{}.{}".format(
+            (self.name or str(self.id)).replace("/", "_"),
+            EXPORT_FORMATS[export_format][1],
+        )
+
+    @api.model
+    def export_signed_documents(self, domain, export_format="txt", batch_size=1000):
+        """Return a generator of a zip archive holding the signed version of
+        every contract matching ``domain``, e.g. one partner or company."""
+        contracts = self.env["contract.contract"].search(
+            domain + [("signed_version_id", "!=", False)]
+        )
+        return iter_archive(
+            (
+                version._get_document_file_name(export_format),
+                version.export_document(export_format, batch_size),
+            )
+            for version in contracts.signed_version_id
+        )
+
+    def button_export_document(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_url",
+            "url": "/contract/version/{}/export/docx".format(self.id),
+            "target": "self",
+        }
+
     def view_contract_version_button(self):
         return {
             "type": "ir.actions.act_window",
@@ -36,6 +257,7 @@ class ContractVersion(models.Model):
             "res_id": self.id,
         }
 
+    @profiled("publish_version")
     def publish_version(self):
         """Метод для публикации версии."""
         self.ensure_one()
@@ -45,7 +267,20 @@ class ContractVersion(models.Model):
         if not self.is_published:
             self.write({"is_published": True})
             self.contract_id.write({"published_version_id": self.id})
+            self.env["contract.version.event"]._log(
+                [
+                    {
+                        "contract_id": self.contract_id.id,
+                        "version_id": self.id,
+                        "event": "publish",
+                        "in_force_version_id": self.id,
+                    }
+                ]
+            )
+            # the draft may have changed since its last render
+            self.env["contract.version.render"]._get_html(self, trust_frozen=False)
 
+    @profiled("rollback_unpublish_version")
     def rollback_unpublish_version(self):
         self.ensure_one()
         if self.is_published:
@@ -54,15 +289,21 @@ class ContractVersion(models.Model):
                     _("Cannot rollback publish version of a signed contract.")
                 )
             self.is_published = False
-            if self.contract_id.published_version_id.id == self.id:
-                published_vers = (
-                    self.contract_id.mapped("version_ids")
-                    .filtered(lambda rec: rec.is_published)
-                    .sorted("create_date", reverse=True)
-                )
-                self.contract_id.published_version_id = (
-                    published_vers[0] if published_vers else False
-                )
+            contract = self.contract_id
+            if contract.published_version_id == self:
+                contract.published_version_id = self.env[
+                    "contract.version.event"
+                ]._get_last_published(contract, self)
+            self.env["contract.version.event"]._log(
+                [
+                    {
+                        "contract_id": contract.id,
+                        "version_id": self.id,
+                        "event": "unpublish",
+                        "in_force_version_id": contract.published_version_id.id,
+                    }
+                ]
+            )
 
     def button_create_section(self):
         self.ensure_one()
@@ -79,5 +320,262 @@ class ContractVersion(models.Model):
             },
         }
 
+    def button_compare_versions(self):
+        self.ensure_one()
+        return {
+            "name": _("Compare Versions"),
+            "type": "ir.actions.act_window",
+            "res_model": "contract.version.diff.wizard",
+            "view_mode": "form",
+            "target": "new",
+            "context": {
+                "default_contract_id": self.contract_id.id,
+                "default_version_id": self.id,
+                "default_base_version_id": self.contract_id.published_version_id.id,
+            },
+        }
+
+    @api.depends("section_ids")
     def _compute_section_number(self):
-        self.sections_number = len(self.section_ids)
+        data = self.env["contract.section"].read_group(
+            [("version_id", "in", self.ids)], ["version_id"], ["version_id"]
+        )
+        counts = {item["version_id"][0]: item["version_id_count"] for item in data}
+        for record in self:
+            record.sections_number = counts.get(record.id, 0)
+
+    @profiled("copy_tree_to")
+    def copy_tree_to(self, target_version):
+        """Copy sections and lines of this version into ``target_version``.
+
+        The whole tree is duplicated with a constant number of SQL statements
+        whatever the size of the version. As with ``ContractLine.copy``, the
+        new lines share the current content of the originals and start their
+        history from it.
+        """
+        self.ensure_one()
+        if target_version.is_published:
+            raise UserError(
+                _("Cannot modify the content of a published contract version.")
+            )
+        self.env.flush_all()
+        contract_id = target_version.contract_id.id
+        section_map = self._bulk_copy_rows(
+            self.env["contract.section"],
+            "version_id",
+            {self.id: target_version.id},
+            {"contract_id": contract_id},
+        )
+        line_map = self._bulk_copy_rows(
+            self.env["contract.line"],
+            "section_id",
+            section_map,
+            {"contract_id": contract_id},
+        )
+        if line_map:
+            self.env.cr.execute(
+                """
+                INSERT INTO contract_line_content_rel (line_id, content_id)
+                SELECT m.new_id, l.current_content_id
+                  FROM contract_line l
+                  JOIN unnest(%s::int[], %s::int[]) AS m(old_id, new_id)
+                    ON m.old_id = l.id
+                 WHERE l.current_content_id IS NOT NULL
+                """,
+                [list(line_map), list(line_map.values())],
+            )
+        self.env["contract.section"].invalidate_model()
+        self.env["contract.line"].invalidate_model()
+        self.env["contract.content"].invalidate_model(["line_ids"])
+        (self | target_version).invalidate_recordset(["section_ids"])
+        return target_version
+
+    def _bulk_copy_rows(self, model, parent_column, parent_map, values):
+        """Duplicate the rows of ``model`` whose ``parent_column`` is a key of
+        ``parent_map`` and attach the copies to the matching new parents.
+
+        :param model: empty recordset of the model to copy
+        :param parent_column: many2one column pointing to the parent record
+        :param parent_map: dict {old parent id: new parent id}
+        :param values: dict of column values forced on every copy
+        :return: dict {old id: new id}
+        """
+        cr = self.env.cr
+        table = model._table
+        cr.execute(
+            'SELECT id, nextval(%s) FROM "{}" WHERE "{}" = ANY(%s) ORDER BY id'.format(
+                table, parent_column
+            ),
+            ["{}_id_seq".format(table), list(parent_map)],
+        )
+        id_map = dict(cr.fetchall())
+        if not id_map:
+            return id_map
+
+        columns = [
+            name
+            for name, field in model._fields.items()
+            if field.store
+            and field.column_type
+            and field.copy
+            and name not in ("id", parent_column, *LOG_ACCESS_COLUMNS)
+            and name not in values
+        ]
+        select = ['t."{}"'.format(name) for name in columns]
+        if "origin_id" in model._fields:
+            # copies remember the record they stem from, see _iter_diff
+            columns.append("origin_id")
+            select.append("COALESCE(t.origin_id, t.id)")
+        fixed = list(values)
+        select += ["%s"] * len(fixed)
+        query = """
+            INSERT INTO "{table}" (id, "{parent}", {columns})
+            SELECT m.new_id, p.new_id, {select},
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM "{table}" t
+              JOIN unnest(%s::int[], %s::int[]) AS m(old_id, new_id)
+                ON m.old_id = t.id
+              JOIN unnest(%s::int[], %s::int[]) AS p(old_id, new_id)
+                ON p.old_id = t."{parent}"
+        """.format(
+            table=table,
+            parent=parent_column,
+            columns=", ".join(
+                '"{}"'.format(name) for name in columns + fixed + LOG_ACCESS_COLUMNS
+            ),
+            select=", ".join(select),
+        )
+        params = [values[name] for name in fixed] + [self.env.uid, self.env.uid]
+        params += [list(id_map), list(id_map.values())]
+        params += [list(parent_map), list(parent_map.values())]
+        cr.execute(query, params)
+        return id_map
+
+    def get_diff(self, base_version_id=None, after_key=None, limit=500):
+        """Return one page of the differences between ``base_version_id``
+        (the published version by default) and this version.
+
+        Only the changed clauses are read, with a text diff when their
+        current content differs. Pass back ``next_key`` as ``after_key``
+        to fetch the following page; it is ``None`` on the last page.
+
+        :return: dict {"changes": list of dicts, "next_key": tuple or None}
+        """
+        self.ensure_one()
+        base_version = (
+            self.browse(base_version_id).exists()
+            if base_version_id
+            else self.contract_id.published_version_id
+        )
+        self._check_diff_access(base_version)
+        changes = list(self._iter_diff(base_version, after_key, limit))
+        contents = self.env["contract.content"].browse(
+            {
+                content_id
+                for change in changes
+                if change["type"] == "line" and change["change"] == "changed"
+                for content_id in (change["old_content_id"], change["new_content_id"])
+                if content_id
+            }
+        )
+        texts = {content.id: content.full_text or "" for content in contents}
+        for change in changes:
+            if change["type"] == "line" and change["change"] == "changed":
+                change["text_diff"] = self._text_diff(
+                    texts.get(change["old_content_id"], ""),
+                    texts.get(change["new_content_id"], ""),
+                )
+        return {
+            "changes": changes,
+            "next_key": changes[-1]["key"] if len(changes) == limit else None,
+        }
+
+    def get_tree(self, fields=None, after_section_id=None, limit=None):
+        """Return this version with its sections, lines and their current
+        text as nested dicts, built by one query.
+
+        :param fields: dict {"version"|"section"|"line": list of keys of
+            ``TREE_FIELDS``}, all the keys of a level by default. Ids are
+            always returned.
+        :param after_section_id: return the sections following this one
+        :param limit: maximum number of sections; pass back ``next_after``
+            as ``after_section_id`` to fetch the following ones, it is
+            ``None`` on the last page.
+        """
+        self.ensure_one()
+        self.check_access_rights("read")
+        self.check_access_rule("read")
+        self.env["contract.section"].check_access_rights("read")
+        self.env["contract.line"].check_access_rights("read")
+        fields = fields or {}
+        columns = {}
+        for level, level_fields in TREE_FIELDS.items():
+            names = fields.get(level) or list(level_fields)
+            unknown = set(names) - set(level_fields)
+            if unknown:
+                raise UserError(
+                    _("Unknown %s fields: %s", level, ", ".join(sorted(unknown)))
+                )
+            columns[level] = "".join(
+                ", '{}', {}".format(name, level_fields[name]) for name in names
+            )
+        self.env.flush_all()
+        self.env.cr.execute(
+            TREE_QUERY.format(**columns),
+            {"version": self.id, "after": after_section_id, "limit": limit},
+        )
+        tree = self.env.cr.fetchone()[0]
+        sections = tree["sections"]
+        tree["next_after"] = (
+            sections[-1]["id"] if limit and len(sections) == limit else None
+        )
+        return tree
+
+    @api.model
+    def _text_diff(self, old_text, new_text):
+        return "\n".join(
+            difflib.unified_diff(
+                old_text.splitlines(), new_text.splitlines(), lineterm="", n=1
+            )
+        )
+
+    def _check_diff_access(self, base_version):
+        """_iter_diff reads both trees in SQL, check they are readable."""
+        (self | base_version).check_access_rights("read")
+        (self | base_version).check_access_rule("read")
+
+    def _iter_diff(self, base_version, after_key=None, limit=None):
+        """Yield the changes of this version compared to ``base_version``.
+
+        Sections and lines are matched through their ``origin_id``, set when
+        a version is cloned, so unchanged clauses are filtered out in SQL by
+        comparing content ids without loading any text. Changes are ordered
+        by ``key`` = (0 for sections | 1 for lines, matching id), which allows
+        keyset paging with ``after_key``.
+        """
+        self.ensure_one()
+        self.env.flush_all()
+        after_key = tuple(after_key) if after_key else (-1, 0)
+        count = 0
+        for kind_key, kind, query in (
+            (0, "section", DIFF_SECTION_QUERY),
+            (1, "line", DIFF_LINE_QUERY),
+        ):
+            if kind_key < after_key[0]:
+                continue
+            self.env.cr.execute(
+                query,
+                {
+                    "base": base_version.id or 0,
+                    "version": self.id,
+                    "after": after_key[1] if kind_key == after_key[0] else 0,
+                    "limit": None if limit is None else limit - count,
+                },
+            )
+            for row in self.env.cr.dictfetchall():
+                row["type"] = kind
+                row["key"] = (kind_key, row["key"])
+                count += 1
+                yield row
+            if limit is not None and count >= limit:
+                return
@@ -0,0 +1,112 @@
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import create_index
+
+EVENT_KINDS = {
+    "publish": "publication",
+    "unpublish": "publication",
+    "sign": "signature",
+    "unsign": "signature",
+}
+
+
+class ContractVersionEvent(models.Model):
+    """Append-only journal of the publications and signatures of versions.
+
+    Each event records the version it concerns and the version in force
+    after it, so the history of a contract is read with index lookups.
+    """
+
+    _name = "contract.version.event"
+    _description = "Contract Version Event"
+    _order = "event_date desc, id desc"
+
+    contract_id = fields.Many2one(
+        "contract.contract", string="Contract", required=True, ondelete="cascade"
+    )
+    version_id = fields.Many2one(
+        "contract.version", string="Version", ondelete="cascade", index=True
+    )
+    event = fields.Selection(
+        [
+            ("publish", "Published"),
+            ("unpublish", "Unpublished"),
+            ("sign", "Signed"),
+            ("unsign", "Unsigned"),
+        ],
+        string="Event",
+        required=True,
+    )
+    kind = fields.Selection(
+        [("publication", "Publication"), ("signature", "Signature")],
+        string="Kind",
+        required=True,
+    )
+    in_force_version_id = fields.Many2one(
+        "contract.version",
+        string="Version in force",
+        ondelete="set null",
+        help="Published or signed version of the contract after the event",
+    )
+    event_date = fields.Datetime(
+        string="Date", required=True, default=fields.Datetime.now
+    )
+    user_id = fields.Many2one(
+        "res.users", string="User", default=lambda self: self.env.user
+    )
+
+    def init(self):
+        create_index(
+            self.env.cr,
+            "contract_version_event_contract_kind_date_index",
+            self._table,
+            ["contract_id", "kind", "event_date DESC", "id DESC"],
+        )
+
+    def write(self, vals):
+        raise UserError(_("Contract version events cannot be modified."))
+
+    def unlink(self):
+        raise UserError(_("Contract version events cannot be deleted."))
+
+    @api.model
+    def _log(self, values_list):
+        """Append events, ``values_list`` being in chronological order."""
+        return self.sudo().create(
+            [dict(values, kind=EVENT_KINDS[values["event"]]) for values in values_list]
+        )
+
+    @api.model
+    def _get_in_force(self, contract, kind, date):
+        """Return the version published or signed (``kind``) on ``contract``
+        at ``date``."""
+        self.flush_model()
+        self.env.cr.execute(
+            """SELECT in_force_version_id
+                 FROM contract_version_event
+                WHERE contract_id = %s AND kind = %s AND event_date <= %s
+                ORDER BY event_date DESC, id DESC
+                LIMIT 1""",
+            [contract.id, kind, date],
+        )
+        row = self.env.cr.fetchone()
+        return self.env["contract.version"].browse(row and row[0])
+
+    @api.model
+    def _get_last_published(self, contract, excluded_version):
+        """Return the most recently published version of ``contract`` which
+        is still published, other than ``excluded_version``."""
+        self.flush_model()
+        self.env["contract.version"].flush_model(["is_published"])
+        self.env.cr.execute(
+            """SELECT e.version_id
+                 FROM contract_version_event e
+                 JOIN contract_version v ON v.id = e.version_id
+                WHERE e.contract_id = %s AND e.kind = 'publication'
+                  AND e.event = 'publish' AND v.is_published AND v.id != %s
+                ORDER BY e.event_date DESC, e.id DESC
+                LIMIT 1""",
+            [contract.id, excluded_version.id],
+        )
+        row = self.env.cr.fetchone()
+        return self.env["contract.version"].browse(row and row[0])
@@ -0,0 +1,37 @@
+from odoo import _lt, models
+from odoo.exceptions import UserError
+
+
+class ContractVersionLockMixin(models.AbstractModel):
+    """Forbids changes to records belonging to a published contract version.
+
+    Inheriting models describe how their table (aliased ``t``) joins the
+    version table (aliased ``v``), so that a whole batch is checked with a
+    single query instead of walking the relations record by record.
+    """
+
+    _name = "contract.version.lock.mixin"
+    _description = "Published Contract Version Lock"
+
+    _published_version_join = None
+    _published_version_error = _lt(
+        "Cannot modify the content of a published contract version."
+    )
+
+    def _raise_if_published_version(self):
+        ids = [id_ for id_ in self.ids if id_]
+        if not ids:
+            return
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            SELECT 1
+              FROM "{table}" t
+              {join}
+             WHERE t.id = ANY(%s) AND v.is_published
+             LIMIT 1
+            """.format(table=self._table, join=self._published_version_join),
+            [ids],
+        )
+        if self.env.cr.fetchone():
+            raise UserError(str(self._published_version_error))
@@ -0,0 +1,109 @@
+import datetime
+
+from odoo import api, fields, models
+
+FINGERPRINT_QUERY = """
+    SELECT md5(string_agg(
+               concat_ws(':', s.id, s.number, s.name, s.sequence,
+                         l.id, l.number, l.sequence, l.current_content_id),
+               ',' ORDER BY s.sequence, s.id, l.sequence, l.id))
+      FROM contract_section s
+      LEFT JOIN contract_line l ON l.section_id = s.id
+     WHERE s.version_id = %s
+"""
+
+
+class ContractVersionRender(models.Model):
+    """Rendered documents of contract versions.
+
+    Published and signed versions cannot be modified, so their document is
+    rendered once and served as is. Drafts are checked against a fingerprint
+    of their tree, and only the most recently viewed ones are kept.
+    """
+
+    _name = "contract.version.render"
+    _description = "Rendered Contract Version"
+    _draft_cache_size = 200
+    # last_access only orders the drafts to collect, so reads refresh it
+    # at most this often instead of writing on every view
+    _last_access_refresh = datetime.timedelta(hours=1)
+
+    version_id = fields.Many2one(
+        "contract.version", required=True, ondelete="cascade", index=True
+    )
+    fingerprint = fields.Char(required=True)
+    html = fields.Html(sanitize=False, prefetch=False)
+    last_access = fields.Datetime(default=fields.Datetime.now)
+
+    _sql_constraints = [
+        (
+            "version_unique",
+            "UNIQUE(version_id)",
+            "A contract version has only one rendered document.",
+        ),
+    ]
+
+    @api.model
+    def _fingerprint(self, version):
+        self.env.flush_all()
+        self.env.cr.execute(FINGERPRINT_QUERY, [version.id])
+        return self.env.cr.fetchone()[0] or ""
+
+    @api.model
+    def _get_html(self, version, trust_frozen=True):
+        """Return the rendered document of ``version``, from cache if possible.
+
+        :param trust_frozen: serve the cached document of a published or
+            signed version without checking its fingerprint
+        """
+        cache = self.sudo().search([("version_id", "=", version.id)], limit=1)
+        frozen = version.is_published or version.is_signed
+        if cache and frozen and trust_frozen:
+            return cache.html
+        fingerprint = self._fingerprint(version)
+        if cache.fingerprint == fingerprint:
+            now = fields.Datetime.now()
+            if (
+                not cache.last_access
+                or cache.last_access < now - self._last_access_refresh
+            ):
+                cache.last_access = now
+            return cache.html
+        html = version._render_document()
+        values = {
+            "fingerprint": fingerprint,
+            "html": html,
+            "last_access": fields.Datetime.now(),
+        }
+        if cache:
+            cache.write(values)
+        else:
+            self.sudo().create(dict(values, version_id=version.id))
+        return html
+
+    @api.model
+    def _warm_up(self, limit=500):
+        """Render published and signed versions which are not cached yet."""
+        versions = self.env["contract.version"].search(
+            [
+                "|",
+                ("is_published", "=", True),
+                ("is_signed", "=", True),
+                ("render_ids", "=", False),
+            ],
+            limit=limit,
+        )
+        for version in versions:
+            self._get_html(version)
+
+    @api.autovacuum
+    def _gc_draft_renders(self):
+        drafts = self.sudo().search(
+            [
+                ("version_id.is_published", "=", False),
+                ("version_id.is_signed", "=", False),
+            ],
+            order="last_access desc",
+            offset=self._draft_cache_size,
+        )
+        drafts.unlink()
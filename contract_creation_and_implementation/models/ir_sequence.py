@@ -0,0 +1,23 @@
+from odoo import models
+
+
+class IrSequence(models.Model):
+    _inherit = "ir.sequence"
+
+    def _create_date_range_seq(self, date):
+        """Contract numbers are counted per day, not per year."""
+        if self.code != "contract.contract":
+            return super(IrSequence, self)._create_date_range_seq(date)
+        # Two transactions may both miss today's range and create one each,
+        # handing out the same numbers. Updating the sequence row serializes
+        # them: the second one waits for the first, then fails with a
+        # serialization error and its request is retried, this time finding
+        # the range created by the first.
+        self.env.cr.execute(
+            "UPDATE ir_sequence SET write_date = write_date WHERE id = %s", [self.id]
+        )
+        return (
+            self.env["ir.sequence.date_range"]
+            .sudo()
+            .create({"date_from": date, "date_to": date, "sequence_id": self.id})
+        )
@@ -31,7 +31,11 @@ class ResPartner(models.Model):
         help="Parent Case",
     )
 
-    @api.depends("self.partner_contract_ids")
+    @api.depends("partner_contract_ids")
     def _compute_contract_count(self):
-        self.ensure_one()
-        self.contract_count = len(self.partner_contract_ids)
+        data = self.env["contract.contract"].read_group(
+            [("partner_id", "in", self.ids)], ["partner_id"], ["partner_id"]
+        )
+        counts = {item["partner_id"][0]: item["partner_id_count"] for item in data}
+        for record in self:
+            record.contract_count = counts.get(record.id, 0)
@@ -6,25 +6,60 @@ from odoo import api, fields, models
 class ResConfigSettings(models.TransientModel):
     _inherit = "res.config.settings"
 
+    # settings field: contract.settings key
+    _contract_settings = {
+        "allow_not_signed_contract": "allow_not_signed_contract",
+        "contract_notification_expiration_period": "notification_expiration_period",
+        "contract_renew_period": "renew_period",
+        "contract_renew_period_type": "renew_period_type",
+        "contract_notification_mode": "notification_mode",
+        "contract_profiling": "profiling",
+        "contract_profiling_slow_threshold": "profiling_slow_threshold",
+    }
+
     allow_not_signed_contract = fields.Boolean(
         string="Allow binding annexes to unsigned contracts",
         help="If switched off, binding annexes is possible for signed contracts only",
     )
+    contract_notification_expiration_period = fields.Integer(
+        string="Default notice period, days",
+    )
+    contract_renew_period = fields.Integer(string="Default renew period")
+    contract_renew_period_type = fields.Selection(
+        [
+            ("days", "Days"),
+            ("months", "Months"),
+            ("years", "Years"),
+        ],
+        string="Default type of renew period",
+    )
+    contract_notification_mode = fields.Selection(
+        [
+            ("contract", "One mail per contract"),
+            ("digest", "One digest per responsible employee"),
+        ],
+        string="Expiration notices",
+    )
+    contract_profiling = fields.Boolean(
+        string="Profile contract actions",
+        help="Record queries and timings of contract actions",
+    )
+    contract_profiling_slow_threshold = fields.Integer(
+        string="Slow action threshold, ms",
+    )
 
     def set_values(self):
         res = super(ResConfigSettings, self).set_values()
-        ir_config = self.env["ir.config_parameter"]
-        ir_config.set_param(
-            "contract.allow_not_signed_contract", self.allow_not_signed_contract
+        self.env["contract.settings"].set(
+            {key: self[name] for name, key in self._contract_settings.items()}
         )
         return res
 
     @api.model
     def get_values(self):
         res = super(ResConfigSettings, self).get_values()
-        ir_config = self.env["ir.config_parameter"].sudo()
-        allow_not_signed_contract = ir_config.get_param(
-            "contract.allow_not_signed_contract"
+        settings = self.env["contract.settings"]
+        res.update(
+            {name: settings.get(key) for name, key in self._contract_settings.items()}
         )
-        res.update({"allow_not_signed_contract": allow_not_signed_contract})
         return res
@@ -0,0 +1,18 @@
+from . import test_performance
+from . import test_profile
+from . import test_settings
+from . import test_schedule
+from . import test_annex_totals
+from . import test_portfolio_report
+from . import test_portal
+from . import test_version_tree
+from . import test_version_events
+from . import test_content
+from . import test_version_diff
+from . import test_import
+from . import test_search
+from . import test_export
+from . import test_sequence
+from . import test_render
+from . import test_numbering
+from . import test_annex
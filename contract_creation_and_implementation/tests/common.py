@@ -0,0 +1,112 @@
+import itertools
+import logging
+import time
+
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+
+class ContractCase(TransactionCase):
+    """Builds contracts with their versions, sections and clauses."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner = cls.env["res.partner"].create({"name": "Contract partner"})
+        cls.contract_numbers = itertools.count()
+
+    def contract_tree(self, sections=1, lines=1, published=True, **values):
+        """Return the import tree of a contract whose version holds
+        ``sections`` x ``lines`` distinct clauses, published by default."""
+        number = next(self.contract_numbers)
+        return {
+            "partner_id": self.partner.id,
+            "type": "with_customer",
+            "commencement_date": "2026-01-01",
+            **values,
+            "versions": [
+                {
+                    "version_number": 1,
+                    "is_published": published,
+                    "sections": [
+                        {
+                            "number": str(section),
+                            "name": "Section {}".format(section),
+                            "lines": [
+                                {
+                                    "number": "{}.{}".format(section, line),
+                                    "content": "Clause {}.{} of contract {}".format(
+                                        section, line, number
+                                    ),
+                                }
+                                for line in range(lines)
+                            ],
+                        }
+                        for section in range(sections)
+                    ],
+                }
+            ],
+        }
+
+    def make_contracts(self, count, **kwargs):
+        trees = [self.contract_tree(**kwargs) for _i in range(count)]
+        self.env["contract.contract"].import_contract_trees(trees)
+        return self.env["contract.contract"].search([], order="id desc", limit=count)
+
+    def make_contract(self, **kwargs):
+        return self.make_contracts(1, **kwargs)
+
+
+class ContractPerformanceCase(ContractCase):
+    """Measures contract flows on trees of growing size.
+
+    A flow is run once per size on fresh data. No size may exceed the count
+    measured on the smallest size in the same run, the flow must be O(1) in
+    queries, nor the absolute budget of the flow, which catches the queries
+    added at every size. Wall-clock times are logged to compare runs.
+    """
+
+    # sizes of the trees, kept below the ORM prefetch limit
+    SIZES = (10, 100, 400)
+    # allowed difference with the query count of the smallest size
+    QUERY_TOLERANCE = 2
+
+    def measure(self, name, setup, flow, sizes=None):
+        """Run ``flow(setup(size))`` for every size.
+
+        :return: dict {size: query count}
+        """
+        counts = {}
+        for size in sizes or self.SIZES:
+            data = setup(size)
+            self.env.flush_all()
+            self.env.invalidate_all()
+            queries = self.cr.sql_log_count
+            start = time.perf_counter()
+            flow(data)
+            self.env.flush_all()
+            duration = time.perf_counter() - start
+            counts[size] = self.cr.sql_log_count - queries
+            _logger.info(
+                "%s, size %s: %s queries in %.3fs", name, size, counts[size], duration
+            )
+        return counts
+
+    def assertFlatQueryCount(self, name, setup, flow, budget, sizes=None):
+        # first run on a tiny tree to warm up caches (templates, sequences, ...)
+        self.measure(name, setup, flow, sizes=(1,))
+        counts = self.measure(name, setup, flow, sizes)
+        flat_budget = counts[min(counts)] + self.QUERY_TOLERANCE
+        self.assertLessEqual(
+            max(counts.values()),
+            flat_budget,
+            "{}: query count grows with the size, {} for a budget of {}".format(
+                name, counts, flat_budget
+            ),
+        )
+        self.assertLessEqual(
+            max(counts.values()),
+            budget,
+            "{}: query budget of {} exceeded, {}".format(name, budget, counts),
+        )
@@ -0,0 +1,67 @@
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractAnnex(ContractCase):
+    def create_annexes(self, contracts, cost=10.0, date="2026-01-15"):
+        return self.env["contract.annex"].create(
+            [
+                {
+                    "contract_id": contract.id,
+                    "annex_cost": cost,
+                    "date_conclusion": date,
+                }
+                for contract in contracts
+            ]
+        )
+
+    def test_numbers_reserved_in_blocks(self):
+        first, second = self.make_contracts(2)
+        # interleaved annexes of two contracts in one batch
+        annexes = self.create_annexes([first, second, first, first, second])
+        self.assertEqual(annexes.mapped("annex_number"), [1, 1, 2, 3, 2])
+        self.assertEqual(first.contract_annex_amount, 3)
+        self.assertEqual(second.contract_annex_amount, 2)
+        self.assertEqual(annexes[3].name, "Annex №3 from 2026-01-15")
+
+        # the next block continues after the reserved one
+        more = self.create_annexes([second, first])
+        self.assertEqual(more.mapped("annex_number"), [3, 4])
+        self.assertEqual(first.contract_annex_amount, 4)
+        self.assertEqual(second.contract_annex_amount, 3)
+
+    def test_totals_after_unlink(self):
+        first, second = self.make_contracts(2)
+        january = self.create_annexes([first, first, second], cost=100.0)
+        february = self.create_annexes([first, second], cost=10.0, date="2026-02-10")
+        self.assertEqual(first.annex_cost_total, 210)
+        self.assertEqual(second.annex_cost_total, 110)
+
+        (january[0] | february).unlink()
+        self.assertEqual(first.annex_cost_total, 100)
+        self.assertEqual(second.annex_cost_total, 100)
+        self.assertEqual(first.contract_annex_amount, 2)
+        self.assertEqual(second.contract_annex_amount, 1)
+
+        Total = self.env["contract.annex.total"]
+        domain = [("contract_id", "in", (first | second).ids)]
+        totals = {
+            (total.contract_id, total.annex_cost, total.annex_count)
+            for total in Total.search(domain)
+        }
+        # months left without annexes have no total row
+        self.assertEqual(totals, {(first, 100, 1), (second, 100, 1)})
+        Total.rebuild()
+        self.assertEqual(
+            {
+                (total.contract_id, total.annex_cost, total.annex_count)
+                for total in Total.search(domain)
+            },
+            totals,
+        )
+
+        (january - january[0]).unlink()
+        self.assertFalse(Total.search(domain))
+        self.assertEqual((first | second).mapped("annex_cost_total"), [0, 0])
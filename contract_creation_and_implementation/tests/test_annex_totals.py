@@ -0,0 +1,53 @@
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractAnnexTotals(ContractCase):
+    def totals(self, contracts):
+        return {
+            (total.contract_id.id, total.month): (total.annex_cost, total.annex_count)
+            for total in self.env["contract.annex.total"].search(
+                [("contract_id", "in", contracts.ids)]
+            )
+        }
+
+    def test_incremental_totals(self):
+        contracts = self.make_contracts(2)
+        annexes = self.env["contract.annex"].create(
+            [
+                {
+                    "contract_id": contract.id,
+                    "date_conclusion": date,
+                    "annex_cost": cost,
+                }
+                for contract in contracts
+                for date, cost in (
+                    ("2026-01-05", 100),
+                    ("2026-01-20", 50),
+                    ("2026-02-01", 10),
+                )
+            ]
+        )
+        self.assertEqual(contracts.mapped("annex_cost_total"), [160, 160])
+
+        annexes[0].annex_cost = 40
+        annexes[1].date_conclusion = "2026-03-01"
+        annexes[5].unlink()
+        self.assertEqual(contracts[0].annex_cost_total, 100)
+        self.assertEqual(contracts[1].annex_cost_total, 150)
+        incremental = self.totals(contracts)
+
+        self.env["contract.annex.total"].rebuild()
+        self.assertEqual(self.totals(contracts), incremental)
+        self.assertEqual(contracts[0].annex_cost_total, 100)
+
+        partner = self.env["res.partner"].create({"name": "New partner"})
+        contracts[0].partner_id = partner
+        self.assertEqual(
+            self.env["contract.annex.total"]
+            .search([("contract_id", "=", contracts[0].id)])
+            .partner_id,
+            partner,
+        )
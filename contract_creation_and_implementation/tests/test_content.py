@@ -0,0 +1,73 @@
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractContent(ContractCase):
+    def test_unlink_delta_base(self):
+        contract = self.make_contract(sections=1, lines=1, published=False)
+        line = contract.version_ids.section_ids.line_ids
+        old_text = " ".join("word{}".format(i) for i in range(50))
+        line._set_content(old_text)
+        old = line.current_content_id
+        line._set_content(old_text + " amended")
+        self.assertEqual(old.delta_base_id, line.current_content_id)
+
+        line.current_content_id.unlink()
+        self.assertFalse(old.delta_base_id)
+        self.assertEqual(old.content, old_text)
+        self.assertEqual(old.full_text, old_text)
+
+    def test_edit_shared_content(self):
+        first, second = self.make_contracts(2, sections=1, lines=1, published=False)
+        first_line = first.version_ids.section_ids.line_ids
+        second_line = second.version_ids.section_ids.line_ids
+        second_line._set_content(first_line.current_content_text)
+        shared = first_line.current_content_id
+        self.assertEqual(second_line.current_content_id, shared)
+
+        shared.with_context(active_id=first_line.id).write({"content": "Amended"})
+        self.assertEqual(first_line.current_content_text, "Amended")
+        self.assertIn(shared, first_line.content_ids)
+        self.assertEqual(second_line.current_content_id, shared)
+        self.assertEqual(second_line.current_content_text, shared.content)
+
+    def test_edit_content_without_line(self):
+        contract = self.make_contract(sections=1, lines=1, published=False)
+        content = contract.version_ids.section_ids.line_ids.current_content_id
+        with self.assertRaises(UserError):
+            content.write({"content": "Amended"})
+
+    def test_search_compressed_revision(self):
+        contract = self.make_contract(sections=1, lines=1, published=False)
+        line = contract.version_ids.section_ids.line_ids
+        words = " ".join("word{}".format(i) for i in range(50))
+        line._set_content(words + " original")
+        old = line.current_content_id
+        line._set_content(words + " amended")
+        self.assertEqual(old.delta_base_id, line.current_content_id)
+        self.assertFalse(old.content)
+
+        Content = self.env["contract.content"]
+        for query, mode in (("original", "fulltext"), ("word49 orig", "substring")):
+            results = Content.search_clauses(query, scope="all", mode=mode)
+            self.assertEqual(
+                [(row["line_id"], row["content_id"]) for row in results],
+                [(line.id, old.id)],
+            )
+            self.assertFalse(Content.search_clauses(query, scope="current", mode=mode))
+
+    def test_history_count_shared_content(self):
+        first, second = self.make_contracts(2, sections=1, lines=1, published=False)
+        first_line = first.version_ids.section_ids.line_ids
+        second_line = second.version_ids.section_ids.line_ids
+        for text in ("First amendment", "Second amendment", "Shared text"):
+            first_line._set_content(text)
+        second_line._set_content("Shared text")
+
+        lines = first_line | second_line
+        lines.invalidate_recordset(["history_count"])
+        self.assertEqual(lines.mapped("history_count"), [4, 2])
+        self.assertEqual(first_line.history_count, len(first_line.content_ids))
@@ -0,0 +1,112 @@
+import io
+import zipfile
+from unittest.mock import patch
+
+import requests
+
+from odoo.tests import HttpCase, tagged
+from odoo.tools import mute_logger
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractExport(HttpCase, ContractCase):
+    def setUp(self):
+        super().setUp()
+        self.contract = self.make_contract(sections=3, lines=2)
+        self.version = self.contract.published_version_id
+        self.authenticate("admin", "admin")
+
+    def version_url(self, export_format):
+        return "/contract/version/%s/export/%s" % (self.version.id, export_format)
+
+    def expected_text(self):
+        return "".join(
+            "\n{} {}\n".format(section.number, section.name)
+            + "".join(
+                "{} {}\n".format(line.number, line.current_content_text)
+                for line in section.line_ids
+            )
+            for section in self.version.section_ids
+        )
+
+    def test_export_txt(self):
+        response = self.url_open(self.version_url("txt"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "text/plain; charset=utf-8")
+        self.assertIn(
+            self.version._get_document_file_name("txt"),
+            response.headers["Content-Disposition"],
+        )
+        self.assertEqual(response.content.decode("utf-8"), self.expected_text())
+
+    def test_export_docx_and_odt(self):
+        texts = [
+            line.current_content_text for line in self.version.section_ids.line_ids
+        ]
+        self.assertEqual(len(texts), 6)
+        for export_format, body_name in (
+            ("docx", "word/document.xml"),
+            ("odt", "content.xml"),
+        ):
+            with self.subTest(export_format=export_format):
+                response = self.url_open(self.version_url(export_format))
+                self.assertEqual(response.status_code, 200)
+                with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+                    self.assertIsNone(archive.testzip())
+                    body = archive.read(body_name).decode("utf-8")
+                    if export_format == "odt":
+                        self.assertEqual(archive.namelist()[0], "mimetype")
+                positions = [body.index(text) for text in texts]
+                self.assertEqual(positions, sorted(positions))
+
+    def test_export_signed_versions(self):
+        tree = self.contract_tree(sections=2, lines=1)
+        tree["versions"][0]["is_signed"] = True
+        self.env["contract.contract"].import_contract_trees([tree])
+        signed = self.env["contract.contract"].search(
+            [("partner_id", "=", self.partner.id), ("signed_version_id", "!=", False)]
+        )
+        self.assertEqual(len(signed), 1)
+
+        response = self.url_open("/contract/partner/%s/export/txt" % self.partner.id)
+        self.assertEqual(response.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                [signed.signed_version_id._get_document_file_name("txt")],
+            )
+            text = archive.read(archive.namelist()[0]).decode("utf-8")
+        self.assertIn(
+            signed.signed_version_id.section_ids.line_ids[-1].current_content_text,
+            text,
+        )
+
+    def test_export_unknown_format(self):
+        response = self.url_open(self.version_url("pdf"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_error_while_streaming(self):
+        Version = self.registry["contract.version"]
+        iter_document_parts = Version._iter_document_parts
+
+        def failing_parts(version, batch_size=1000):
+            parts = iter_document_parts(version, batch_size)
+            yield next(parts)
+            raise ValueError("export failed")
+
+        last_text = self.version.section_ids.line_ids[-1].current_content_text
+        with patch.object(Version, "_iter_document_parts", failing_parts), mute_logger(
+            "odoo.http", "werkzeug"
+        ):
+            try:
+                body = self.url_open(self.version_url("txt")).content
+            except requests.exceptions.RequestException:
+                body = b""
+        # the client never gets a document which looks complete
+        self.assertNotIn(last_text.encode("utf-8"), body)
+
+        # the cursor of the failed export was released
+        response = self.url_open(self.version_url("txt"))
+        self.assertEqual(response.content.decode("utf-8"), self.expected_text())
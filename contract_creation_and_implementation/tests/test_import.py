@@ -0,0 +1,55 @@
+import csv
+import os
+import tempfile
+
+from odoo.tests import tagged
+
+from ..cli.contract_import import read_csv_trees
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractImport(ContractCase):
+    def write_csv(self, rows):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def test_csv_values_are_typed(self):
+        row = {
+            "contract.partner_id": str(self.partner.id),
+            "contract.type": "with_customer",
+            "contract.commencement_date": "2026-01-01",
+            "contract.renew_automatically": "False",
+            "contract.renew_period": "12",
+            "version_number": "1",
+            "is_published": "False",
+            "is_signed": "0",
+            "section_number": "1",
+            "section_name": "Subject",
+            "line_number": "1.1",
+            "content": "Imported clause",
+        }
+        trees = read_csv_trees(self.env, self.write_csv([row]))
+        self.assertEqual(len(trees), 1)
+        tree = trees[0]
+        self.assertEqual(tree["partner_id"], self.partner.id)
+        self.assertIs(tree["renew_automatically"], False)
+        self.assertEqual(tree["renew_period"], 12)
+        self.assertIs(tree["versions"][0]["is_published"], False)
+        self.assertIs(tree["versions"][0]["is_signed"], False)
+
+        self.env["contract.contract"].import_contract_trees(trees)
+        contract = self.env["contract.contract"].search([], order="id desc", limit=1)
+        self.assertFalse(contract.renew_automatically)
+        self.assertFalse(contract.published_version_id)
+        self.assertFalse(contract.signed_version_id)
+        self.assertFalse(contract.version_ids.is_published)
+        self.assertEqual(
+            contract.version_ids.section_ids.line_ids.current_content_text,
+            "Imported clause",
+        )
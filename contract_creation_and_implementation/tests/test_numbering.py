@@ -0,0 +1,67 @@
+import importlib.util
+import os
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractNumbering(ContractCase):
+    def create_contracts(self, day, count):
+        Contract = self.env["contract.contract"].with_context(ir_sequence_date=day)
+        return Contract.create(
+            [
+                {"partner_id": self.partner.id, "type": "with_customer"}
+                for _i in range(count)
+            ]
+        )
+
+    def test_numbers_restart_every_day(self):
+        first_day = self.create_contracts("2026-03-01", 3)
+        second_day = self.create_contracts("2026-03-02", 2)
+        first_day |= self.create_contracts("2026-03-01", 1)
+        self.assertEqual(
+            first_day.mapped("name"),
+            ["2603-01-1", "2603-01-2", "2603-01-3", "2603-01-4"],
+        )
+        self.assertEqual(second_day.mapped("name"), ["2603-02-1", "2603-02-2"])
+
+        sequence = self.env.ref("contract.seq_contract_contract")
+        ranges = sequence.date_range_ids.filtered(
+            lambda date_range: str(date_range.date_from) in ("2026-03-01", "2026-03-02")
+        )
+        self.assertEqual(
+            sorted((str(r.date_from), str(r.date_to)) for r in ranges),
+            [("2026-03-01", "2026-03-01"), ("2026-03-02", "2026-03-02")],
+        )
+
+    def test_migration_continues_today(self):
+        today = fields.Date.today()
+        self.create_contracts(today, 2)
+        sequence = self.env.ref("contract.seq_contract_contract")
+        sequence.date_range_ids.filtered(
+            lambda date_range: date_range.date_from == today
+        ).unlink()
+        created_today = self.env["contract.contract"].search_count(
+            [("create_date", ">=", today)]
+        )
+
+        path = os.path.join(
+            os.path.dirname(__file__),
+            os.pardir,
+            "migrations",
+            "16.0.0.7",
+            "post-migrate.py",
+        )
+        spec = importlib.util.spec_from_file_location("contract_migration", path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        migration.migrate(self.env.cr, "16.0.0.6")
+
+        (contract,) = self.create_contracts(today, 1)
+        self.assertEqual(
+            contract.name,
+            "{}-{}".format(today.strftime("%y%m-%d"), created_today + 1),
+        )
@@ -0,0 +1,229 @@
+import datetime
+import logging
+import time
+
+from odoo.tests import tagged
+
+from .common import ContractPerformanceCase
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged("contract_performance", "post_install", "-at_install")
+class TestContractPerformance(ContractPerformanceCase):
+    # batched inserts create at least this many records per query on average
+    IMPORT_RECORDS_PER_QUERY = 5
+    # floor of the import rate, far below what batching allows on any host
+    IMPORT_CONTRACTS_PER_SECOND = 20
+
+    def test_create_contract(self):
+        def setup(size):
+            # numbering must not depend on the contracts created today
+            self.make_contracts(size)
+
+        def flow(data):
+            self.env["contract.contract"].create(
+                {"partner_id": self.partner.id, "type": "with_customer"}
+            )
+
+        self.assertFlatQueryCount("create contract", setup, flow, budget=30)
+
+    def test_wizard_add_section_and_line(self):
+        def setup(size):
+            return self.make_contract(sections=size, lines=1, published=False)
+
+        def flow(contract):
+            version = contract.version_ids
+            self.env["contract.section.wizard"].create(
+                {
+                    "name": "New section",
+                    "number": "99",
+                    "version_id": version.id,
+                    "contract_id": contract.id,
+                }
+            ).button_create()
+            section = version.section_ids[-1]
+            self.env["contract.line.wizard"].create(
+                {
+                    "section_id": section.id,
+                    "contract_id": contract.id,
+                    "content_text": "New clause {}".format(section.id),
+                    "number": "99.1",
+                }
+            ).button_create()
+
+        self.assertFlatQueryCount("add section and line", setup, flow, budget=60)
+
+    def test_wizard_add_line_to_large_section(self):
+        def setup(size):
+            return self.make_contract(sections=1, lines=size, published=False)
+
+        def flow(contract):
+            section = contract.version_ids.section_ids
+            self.env["contract.line.wizard"].create(
+                {
+                    "section_id": section.id,
+                    "contract_id": contract.id,
+                    "content_text": "New clause {}".format(section.id),
+                    "number": "0.new",
+                }
+            ).button_create()
+
+        self.assertFlatQueryCount("add line", setup, flow, budget=40)
+
+    def test_publish_and_rollback(self):
+        def setup(size):
+            return self.make_contract(
+                sections=size // 10 + 1, lines=10, published=False
+            )
+
+        def flow(contract):
+            version = contract.version_ids
+            version.publish_version()
+            version.rollback_unpublish_version()
+
+        self.assertFlatQueryCount("publish and rollback", setup, flow, budget=60)
+
+    def test_new_version_from_large_base(self):
+        def setup(size):
+            return self.make_contract(sections=size // 10 + 1, lines=10)
+
+        def flow(contract):
+            self.env["contract.version.creation.wizard"].create(
+                {
+                    "contract_id": contract.id,
+                    "base_version_id": contract.published_version_id.id,
+                }
+            ).button_create_new_version()
+
+        self.assertFlatQueryCount("new version", setup, flow, budget=30)
+
+    def test_copy_contract(self):
+        def setup(size):
+            return self.make_contract(sections=size // 10 + 1, lines=10)
+
+        def flow(contract):
+            contract.copy()
+
+        self.assertFlatQueryCount("copy contract", setup, flow, budget=60)
+
+    def test_sign(self):
+        def setup(size):
+            return self.make_contract(sections=size // 10 + 1, lines=10)
+
+        def flow(contract):
+            self.env["contract.version.sign.wizard"].create(
+                {
+                    "contract_id": contract.id,
+                    "published_version_id": contract.published_version_id.id,
+                    "version_selection": "published",
+                }
+            ).action_sign()
+
+        self.assertFlatQueryCount("sign", setup, flow, budget=40)
+
+    def test_create_annexes(self):
+        def setup(size):
+            return self.make_contract(), size
+
+        def flow(data):
+            contract, size = data
+            self.env["contract.annex"].create(
+                [{"contract_id": contract.id, "annex_cost": 10.0} for _i in range(size)]
+            )
+
+        # the ORM inserts up to 100 rows per statement
+        self.assertFlatQueryCount(
+            "create annexes", setup, flow, budget=30, sizes=(10, 50, 100)
+        )
+
+    def test_check_contracts(self):
+        today = datetime.date.today()
+
+        def setup(size):
+            self.env["contract.contract"].search([("state", "=", "sign")]).write(
+                {"state": "close"}
+            )
+            for renew_automatically in (True, False):
+                self.make_contracts(
+                    size // 2,
+                    state="sign",
+                    expiration_date=today,
+                    renew_automatically=renew_automatically,
+                )
+
+        def flow(data):
+            # closing posts one tracking message per contract by design
+            self.env["contract.contract"].with_context(
+                tracking_disable=True
+            ).check_contracts()
+
+        self.assertFlatQueryCount("check contracts", setup, flow, budget=80)
+
+    def test_clause_history_storage(self):
+        """Storage of a long clause history against its full texts, and the
+        time to rebuild every revision from the deltas."""
+        contract = self.make_contract(sections=1, lines=1, published=False)
+        line = contract.version_ids.section_ids.line_ids
+        initial_text = line.current_content_text
+        words = ["word{}".format(i) for i in range(300)]
+        texts = []
+        for revision in range(60):
+            words[revision * 7 % len(words)] = "amended{}".format(revision)
+            texts.append(" ".join(words))
+            line._set_content(texts[-1])
+        self.env.flush_all()
+
+        contents = line.content_ids
+        self.cr.execute(
+            """SELECT SUM(COALESCE(octet_length(content), 0)
+                          + COALESCE(octet_length(delta), 0))
+                 FROM contract_content WHERE id = ANY(%s)""",
+            [contents.ids],
+        )
+        stored = self.cr.fetchone()[0]
+        full = sum(len(text.encode()) for text in texts)
+
+        self.env.invalidate_all()
+        start = time.perf_counter()
+        rebuilt = {content.full_text for content in line.content_ids}
+        duration = time.perf_counter() - start
+        _logger.info(
+            "clause history: %s revisions, %s bytes stored for %s bytes of text"
+            " (%.0f%%), rebuilt in %.3fs",
+            len(contents),
+            stored,
+            full,
+            100.0 * stored / full,
+            duration,
+        )
+        self.assertEqual(rebuilt, set(texts) | {initial_text})
+        self.assertLessEqual(stored, full * 0.3)
+
+    def test_import_throughput(self):
+        """Throughput of import_contract_trees on contracts of 3 sections of
+        5 clauses. Creating record by record would cost at least one query
+        per record: the batched import must stay far below that."""
+        count = 400
+        trees = [self.contract_tree(sections=3, lines=5) for _i in range(count)]
+        # contract, version, sections and lines of each tree
+        records = count * (1 + 1 + 3 + 3 * 5)
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.cr.sql_log_count
+        start = time.perf_counter()
+        self.env["contract.contract"].import_contract_trees(trees)
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+        queries = self.cr.sql_log_count - queries
+        _logger.info(
+            "import: %s contracts (%s records) in %.3fs, %.1f contracts/s,"
+            " %s queries",
+            count,
+            records,
+            duration,
+            count / duration,
+            queries,
+        )
+        self.assertLessEqual(queries, records / self.IMPORT_RECORDS_PER_QUERY)
+        self.assertGreaterEqual(count / duration, self.IMPORT_CONTRACTS_PER_SECOND)
@@ -0,0 +1,68 @@
+from odoo.tests import HttpCase, new_test_user, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestContractPortal(HttpCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.portal_user = new_test_user(
+            cls.env, login="contract_portal", groups="base.group_portal"
+        )
+        partner = cls.portal_user.partner_id
+        contracts = cls.env["contract.contract"]
+        cls.env["contract.contract"].import_contract_trees(
+            [
+                {
+                    "partner_id": partner.id,
+                    "type": "with_customer",
+                    "versions": [
+                        {
+                            "version_number": number,
+                            "is_published": number == 1,
+                            "sections": [
+                                {
+                                    "number": "1",
+                                    "name": "Subject",
+                                    "lines": [
+                                        {"number": "1.1", "content": "Portal clause"}
+                                    ],
+                                }
+                            ],
+                        }
+                        for number in (1, 2)
+                    ],
+                }
+            ]
+        )
+        cls.contract = contracts.search([("partner_id", "=", partner.id)])
+        cls.published = cls.contract.published_version_id
+        cls.draft = cls.contract.version_ids - cls.published
+
+    def version_url(self, version):
+        return "/my/contracts/%s/versions/%s" % (self.contract.id, version.id)
+
+    def test_published_version_is_cached(self):
+        self.authenticate("contract_portal", "contract_portal")
+        response = self.url_open(self.version_url(self.published))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Portal clause", response.text)
+        etag = response.headers["ETag"]
+        self.assertEqual(response.headers["Cache-Control"], "private, no-cache")
+
+        response = self.url_open(
+            self.version_url(self.published), headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_draft_is_hidden(self):
+        self.authenticate("contract_portal", "contract_portal")
+        response = self.url_open(self.version_url(self.draft))
+        self.assertEqual(response.status_code, 404)
+
+    def test_version_out_of_force_is_revoked(self):
+        self.authenticate("contract_portal", "contract_portal")
+        self.draft.publish_version()
+        self.published.rollback_unpublish_version()
+        response = self.url_open(self.version_url(self.published))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,23 @@
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractPortfolioReport(ContractCase):
+    def test_refresh(self):
+        contracts = self.make_contracts(3, sections=1, lines=1)
+        self.env["contract.annex"].create(
+            {"contract_id": contracts[0].id, "annex_cost": 25}
+        )
+        report = self.env["contract.portfolio.report"]
+        report.refresh()
+        rows = report.search([("contract_id", "in", contracts.ids)])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(sum(rows.mapped("version_count")), 3)
+        self.assertEqual(sum(rows.mapped("annex_count")), 1)
+        self.assertEqual(sum(rows.mapped("annex_cost_total")), 25)
+        groups = report.read_group(
+            [("contract_id", "in", contracts.ids)], ["contract_count"], ["state"]
+        )
+        self.assertEqual(groups[0]["contract_count"], 3)
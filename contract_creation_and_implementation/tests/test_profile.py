@@ -0,0 +1,24 @@
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("contract_performance", "post_install", "-at_install")
+class TestContractProfile(ContractCase):
+    def test_profiling_mode(self):
+        contract = self.make_contract(sections=5, lines=2)
+        logs = self.env["contract.profile.log"]
+        contract.copy()
+        self.assertFalse(logs.search([]), "Profiling must be opt-in")
+
+        self.env["contract.settings"].set(
+            {"profiling": True, "profiling_slow_threshold": 0}
+        )
+        contract.copy()
+        log = logs.search([("action", "=", "copy")])
+        self.assertEqual(len(log), 1)
+        self.assertEqual(log.model, "contract.contract")
+        self.assertEqual(log.record_count, 1)
+        self.assertGreater(log.query_count, 0)
+        self.assertTrue(log.is_slow)
+        self.assertTrue(logs.search([("action", "=", "copy_tree_to")]))
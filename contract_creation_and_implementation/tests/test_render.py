@@ -0,0 +1,95 @@
+import datetime
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractVersionRender(ContractCase):
+    def setUp(self):
+        super().setUp()
+        self.Render = self.env["contract.version.render"]
+        self.renders = []
+        render_document = self.registry["contract.version"]._render_document
+
+        def counted_render_document(version):
+            self.renders.append(version.id)
+            return render_document(version)
+
+        patcher = patch.object(
+            self.registry["contract.version"],
+            "_render_document",
+            counted_render_document,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def draft_version(self):
+        return self.make_contract(sections=2, lines=2, published=False).version_ids
+
+    def test_cache_hit(self):
+        version = self.draft_version()
+        html = self.Render._get_html(version)
+        self.assertIn(version.section_ids.line_ids[0].current_content_text, html)
+        self.assertEqual(self.Render._get_html(version), html)
+        self.assertEqual(self.renders, [version.id])
+
+    def test_content_change_invalidates(self):
+        version = self.draft_version()
+        self.Render._get_html(version)
+        version.section_ids.line_ids[0]._set_content("Amended clause")
+        self.assertIn("Amended clause", self.Render._get_html(version))
+        self.assertEqual(self.renders, [version.id, version.id])
+        self.assertEqual(len(version.render_ids), 1)
+
+    def test_frozen_version_is_trusted(self):
+        version = self.make_contract(sections=1, lines=1).version_ids
+        self.Render._get_html(version)
+        with patch.object(type(self.Render), "_fingerprint") as fingerprint:
+            self.Render._get_html(version)
+        fingerprint.assert_not_called()
+        self.assertEqual(self.renders, [version.id])
+
+    def test_warm_up(self):
+        version = self.make_contract(sections=1, lines=1).version_ids
+        draft = self.draft_version()
+        self.assertFalse(version.render_ids)
+        self.Render._warm_up()
+        self.assertTrue(version.render_ids)
+        self.assertFalse(draft.render_ids)
+
+    def test_gc_keeps_recent_drafts(self):
+        published = self.make_contract(sections=1, lines=1).version_ids
+        old, recent = self.draft_version(), self.draft_version()
+        for version in (published, old, recent):
+            self.Render._get_html(version)
+        old.render_ids.last_access = fields.Datetime.now() - datetime.timedelta(days=1)
+        with patch.object(type(self.Render), "_draft_cache_size", 1):
+            self.Render._gc_draft_renders()
+        self.assertFalse(old.render_ids)
+        self.assertTrue(recent.render_ids)
+        self.assertTrue(published.render_ids)
+
+    def test_last_access_is_throttled(self):
+        version = self.draft_version()
+        self.Render._get_html(version)
+        cache = version.render_ids
+        now = fields.Datetime.now()
+        recent = now - self.Render._last_access_refresh / 2
+        cache.last_access = recent
+        with patch.object(
+            type(self.Render), "write", autospec=True, side_effect=type(cache).write
+        ) as write:
+            self.Render._get_html(version)
+            self.Render._get_html(version)
+        write.assert_not_called()
+        self.assertEqual(cache.last_access, recent)
+
+        stale = now - self.Render._last_access_refresh * 2
+        cache.last_access = stale
+        self.Render._get_html(version)
+        self.assertGreater(cache.last_access, stale)
+        self.assertEqual(self.renders, [version.id])
@@ -0,0 +1,98 @@
+import datetime
+
+from dateutil.relativedelta import relativedelta
+
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractSchedule(ContractCase):
+    def test_next_action_date(self):
+        today = datetime.date.today()
+        contract = self.make_contract(
+            state="sign",
+            expiration_date=today + datetime.timedelta(days=5),
+            notification_expiration=True,
+            notification_expiration_period=10,
+            renew_automatically=True,
+            renew_period=1,
+            renew_period_type="years",
+        )
+        self.assertEqual(contract.next_action_date, today - datetime.timedelta(days=5))
+
+        # the notice missed five days ago is still sent
+        contract.check_contracts()
+        self.assertEqual(contract.last_notification_date, today)
+        self.assertEqual(contract.next_action_date, contract.expiration_date)
+
+        expired = today - datetime.timedelta(days=1)
+        contract.expiration_date = expired
+        contract.check_contracts()
+        self.assertEqual(contract.expiration_date, expired + relativedelta(years=1))
+        self.assertEqual(contract.state, "sign")
+        self.assertGreater(contract.next_action_date, today)
+
+        contract.action_close()
+        self.assertFalse(contract.next_action_date)
+
+    def test_expiration_digest(self):
+        today = datetime.date.today()
+        self.env["contract.settings"].set({"notification_mode": "digest"})
+        user = self.env["res.users"].create(
+            {
+                "name": "Digest user",
+                "login": "contract_digest_user",
+                "email": "digest@example.com",
+                "notification_type": "email",
+            }
+        )
+        contracts = self.make_contracts(
+            3,
+            state="sign",
+            expiration_date=today + datetime.timedelta(days=1),
+            notification_expiration=True,
+            notification_expiration_period=1,
+            responsible_employee_id=user.id,
+        )
+        mails = self.env["mail.mail"].search([])
+        contracts.check_contracts()
+        digest = self.env["mail.mail"].search([]) - mails
+        self.assertEqual(len(digest), 1)
+        self.assertEqual(digest.recipient_ids, user.partner_id)
+        self.assertEqual(digest.subject, "Reminder of the expiration of 3 contracts")
+        for contract in contracts:
+            self.assertIn(contract.name, digest.body_html)
+        self.assertEqual(set(contracts.mapped("last_notification_date")), {today})
+
+    def test_catch_up_renewal(self):
+        today = datetime.date.today()
+        by_days = self.make_contracts(
+            2,
+            state="sign",
+            expiration_date=today - datetime.timedelta(days=10),
+            renew_automatically=True,
+            renew_period=3,
+            renew_period_type="days",
+        )
+        by_months = self.make_contract(
+            state="sign",
+            expiration_date=today - relativedelta(months=5, days=3),
+            renew_automatically=True,
+            renew_period=2,
+            renew_period_type="months",
+        )
+        messages = self.env["mail.message"].search([])
+        (by_days | by_months).check_contracts()
+
+        self.assertEqual(
+            set(by_days.mapped("expiration_date")), {today + datetime.timedelta(days=2)}
+        )
+        self.assertEqual(
+            by_months.expiration_date,
+            today - relativedelta(months=5, days=3) + relativedelta(months=6),
+        )
+        tracked = self.env["mail.message"].search([]) - messages
+        self.assertEqual(len(tracked), 3)
+        self.assertEqual(tracked.tracking_value_ids.field.name, "expiration_date")
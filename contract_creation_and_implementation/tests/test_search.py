@@ -0,0 +1,123 @@
+from odoo.tests import new_test_user, tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestClauseSearch(ContractCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Contract = cls.env["contract.contract"]
+        Contract.import_contract_trees(
+            [
+                cls.clause_tree(
+                    cls.partner,
+                    ("Penalty for late delivery", True, True),
+                    ("Penalty for late payment", True, False),
+                ),
+                cls.clause_tree(cls.partner, ("Warranty of six months", False, False)),
+            ]
+        )
+        cls.draft_contract, cls.contract = Contract.search(
+            [], order="id desc", limit=2
+        )
+        cls.signed_line, cls.published_line = cls.contract.version_ids.sorted(
+            "version_number"
+        ).section_ids.line_ids
+        cls.draft_line = cls.draft_contract.version_ids.section_ids.line_ids
+        cls.draft_line._set_content("Warranty of twelve months")
+
+    @classmethod
+    def clause_tree(cls, partner, *versions):
+        return {
+            "partner_id": partner.id,
+            "type": "with_customer",
+            "versions": [
+                {
+                    "version_number": number,
+                    "is_published": published,
+                    "is_signed": signed,
+                    "sections": [
+                        {
+                            "number": "1",
+                            "name": "Terms",
+                            "lines": [{"number": "1.1", "content": text}],
+                        }
+                    ],
+                }
+                for number, (text, published, signed) in enumerate(versions, 1)
+            ],
+        }
+
+    def search_lines(self, query, scope, mode="fulltext", **kwargs):
+        return {
+            row["line_id"]
+            for row in self.env["contract.content"].search_clauses(
+                query, scope=scope, mode=mode, **kwargs
+            )
+        }
+
+    def test_scopes(self):
+        published = self.contract.published_version_id
+        self.assertEqual(published, self.published_line.section_id.version_id)
+        signed = self.contract.signed_version_id
+        self.assertEqual(signed, self.signed_line.section_id.version_id)
+        expected = {
+            ("penalty delivery", "all"): {self.signed_line.id},
+            ("penalty delivery", "current"): {self.signed_line.id},
+            ("penalty delivery", "published"): set(),
+            ("penalty delivery", "signed"): {self.signed_line.id},
+            ("penalty payment", "published"): {self.published_line.id},
+            ("penalty payment", "signed"): set(),
+            ("penalty -payment", "current"): {self.signed_line.id},
+            ("six months", "all"): {self.draft_line.id},
+            ("six months", "current"): set(),
+            ("twelve months", "current"): {self.draft_line.id},
+        }
+        for (query, scope), lines in expected.items():
+            with self.subTest(query=query, scope=scope):
+                self.assertEqual(self.search_lines(query, scope), lines)
+
+    def test_substring_mode(self):
+        expected = {
+            ("late pay", "current"): {self.published_line.id},
+            ("late", "published"): {self.published_line.id},
+            ("late", "signed"): {self.signed_line.id},
+            ("of six", "all"): {self.draft_line.id},
+            ("of six", "current"): set(),
+            ("100%", "all"): set(),
+        }
+        for (query, scope), lines in expected.items():
+            with self.subTest(query=query, scope=scope):
+                self.assertEqual(self.search_lines(query, scope, "substring"), lines)
+
+    def test_limit_counts_readable_clauses(self):
+        hidden_partner = self.env["res.partner"].create({"name": "Hidden partner"})
+        self.env["contract.contract"].import_contract_trees(
+            [
+                self.clause_tree(partner, ("Confidentiality clause", True, False))
+                for partner in [hidden_partner] * 3 + [self.partner] * 2
+            ]
+        )
+        user = new_test_user(
+            self.env, login="contract_searcher", groups="contract.group_contract_reader"
+        )
+        self.env["ir.rule"].create(
+            {
+                "name": "Contracts of one partner",
+                "model_id": self.env["ir.model"]._get_id("contract.contract"),
+                "domain_force": "[('partner_id', '=', %s)]" % self.partner.id,
+                "groups": [(4, self.env.ref("contract.group_contract_reader").id)],
+            }
+        )
+        results = (
+            self.env["contract.content"]
+            .with_user(user)
+            .search_clauses("confidentiality", scope="current", limit=2)
+        )
+        self.assertEqual(len(results), 2)
+        contracts = self.env["contract.contract"].browse(
+            [row["contract_id"] for row in results]
+        )
+        self.assertEqual(contracts.partner_id, self.partner)
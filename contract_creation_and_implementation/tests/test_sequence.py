@@ -0,0 +1,58 @@
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractSequence(ContractCase):
+    def setUp(self):
+        super().setUp()
+        contract = self.make_contract(sections=2, lines=3, published=False)
+        self.section, self.other_section = contract.version_ids.section_ids
+        self.a, self.b, self.c = self.section.line_ids
+
+    def assertLines(self, section, lines):
+        self.assertEqual(section.line_ids, lines)
+        sequences = section.line_ids.mapped("sequence")
+        self.assertEqual(len(set(sequences)), len(sequences))
+
+    def exhaust_gaps(self):
+        for sequence, line in enumerate(self.a | self.b | self.c, 1):
+            line.sequence = sequence
+
+    def test_move_between_siblings(self):
+        self.c.move_to(self.section.id, after_id=self.a.id)
+        self.assertLines(self.section, self.a | self.c | self.b)
+
+    def test_move_first_and_last(self):
+        self.c.move_to(self.section.id)
+        self.assertLines(self.section, self.c | self.a | self.b)
+        self.c.move_to(self.section.id, after_id=self.b.id)
+        self.assertLines(self.section, self.a | self.b | self.c)
+
+    def test_move_to_other_section(self):
+        first, second, third = self.other_section.line_ids
+        (self.a | self.c).move_to(self.other_section.id, after_id=first.id)
+        self.assertLines(self.section, self.b)
+        self.assertLines(self.other_section, first | self.a | self.c | second | third)
+
+    def test_rebalance_between_siblings(self):
+        self.exhaust_gaps()
+        self.c.move_to(self.section.id, after_id=self.a.id)
+        self.assertLines(self.section, self.a | self.c | self.b)
+        # siblings are renumbered with full gaps again
+        self.assertEqual(
+            self.section.line_ids.mapped("sequence"),
+            [self.c._sequence_gap * position for position in (1, 2, 3)],
+        )
+
+    def test_rebalance_first_position(self):
+        self.exhaust_gaps()
+        (self.b | self.c).move_to(self.section.id)
+        self.assertLines(self.section, self.b | self.c | self.a)
+        self.assertTrue(all(line.sequence > 0 for line in self.section.line_ids))
+
+    def test_move_last_with_exhausted_gaps(self):
+        self.exhaust_gaps()
+        self.a.move_to(self.section.id, after_id=self.c.id)
+        self.assertLines(self.section, self.b | self.c | self.a)
@@ -0,0 +1,23 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestContractSettings(TransactionCase):
+    def test_typed_values(self):
+        settings = self.env["contract.settings"]
+        ir_config = self.env["ir.config_parameter"].sudo()
+        ir_config.set_param("contract.allow_not_signed_contract", "False")
+        ir_config.set_param("contract.renew_period", "3")
+        self.assertIs(settings.get("allow_not_signed_contract"), False)
+        self.assertEqual(settings.get("renew_period"), 3)
+
+        settings.set({"allow_not_signed_contract": True, "renew_period_type": "years"})
+        self.assertIs(settings.get("allow_not_signed_contract"), True)
+        self.assertEqual(settings.get("renew_period_type"), "years")
+
+    def test_no_queries_once_cached(self):
+        settings = self.env["contract.settings"]
+        settings.get("allow_not_signed_contract")
+        with self.assertQueryCount(0):
+            settings.get("allow_not_signed_contract")
+            settings.get("notification_expiration_period")
@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+from odoo.exceptions import AccessError
+from odoo.tests import new_test_user, tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractVersionDiff(ContractCase):
+    def new_version(self, contract):
+        published = contract.published_version_id
+        self.env["contract.version.creation.wizard"].create(
+            {"contract_id": contract.id, "base_version_id": published.id}
+        ).button_create_new_version()
+        return contract.version_ids - published
+
+    def test_moved_lines(self):
+        contract = self.make_contract(sections=1, lines=4)
+        version = self.new_version(contract)
+        section = version.section_ids
+        self.assertEqual(version.get_diff()["changes"], [])
+
+        # renumbering the lines in the same order is not a move
+        for position, line in enumerate(section.line_ids):
+            line.sequence = (position + 1) * 10
+        self.assertEqual(version.get_diff()["changes"], [])
+
+        first, last = section.line_ids[0], section.line_ids[-1]
+        last.move_to(section.id)
+        changes = version.get_diff()["changes"]
+        # the clause now following the moved one changed its neighbour too
+        self.assertEqual(
+            {(change["new_id"], change["change"]) for change in changes},
+            {(first.id, "moved"), (last.id, "moved")},
+        )
+
+    def diff_wizard(self, version, user=None):
+        Wizard = self.env["contract.version.diff.wizard"].with_user(
+            user or self.env.user
+        )
+        return Wizard.create(
+            {
+                "contract_id": version.contract_id.id,
+                "version_id": version.id,
+                "base_version_id": version.contract_id.published_version_id.id,
+            }
+        )
+
+    def test_wizard_pages(self):
+        contract = self.make_contract(sections=1, lines=5)
+        version = self.new_version(contract)
+        lines = version.section_ids.line_ids
+        for line in lines[:3]:
+            line._set_content("Amended " + line.current_content_text)
+
+        wizard = self.diff_wizard(version)
+        Wizard = type(wizard)
+        with patch.object(Wizard, "_page_size", 2):
+            wizard.button_compare()
+            first_page = wizard.line_ids.mapped("new_content_id")
+            self.assertEqual(len(first_page), 2)
+            self.assertTrue(wizard.next_key)
+            wizard.button_next_changes()
+            second_page = wizard.line_ids.mapped("new_content_id")
+            self.assertFalse(wizard.next_key)
+        self.assertEqual(first_page | second_page, lines[:3].current_content_id)
+        self.assertEqual(set(wizard.line_ids.mapped("change")), {"changed"})
+
+    def test_wizard_checks_base_access(self):
+        contract = self.make_contract(sections=1, lines=1)
+        version = self.new_version(contract)
+        user = new_test_user(
+            self.env, login="contract_differ", groups="contract.group_contract_reader"
+        )
+        self.env["ir.rule"].create(
+            {
+                "name": "Draft versions only",
+                "model_id": self.env["ir.model"]._get_id("contract.version"),
+                "domain_force": "[('is_published', '=', False)]",
+                "groups": [(4, self.env.ref("contract.group_contract_reader").id)],
+            }
+        )
+        wizard = self.diff_wizard(version, user)
+        with self.assertRaises(AccessError):
+            wizard.button_compare()
+        self.assertFalse(wizard.sudo().line_ids)
@@ -0,0 +1,55 @@
+import datetime
+
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractVersionEvents(ContractCase):
+    def test_rollback_and_in_force(self):
+        contract = self.make_contract()
+        first = contract.published_version_id
+        second = first.copy({"is_published": False, "version_number": 2})
+        third = first.copy({"is_published": False, "version_number": 3})
+        second.publish_version()
+        third.publish_version()
+        self.assertEqual(contract.published_version_id, third)
+
+        second.rollback_unpublish_version()
+        self.assertEqual(contract.published_version_id, third)
+        third.rollback_unpublish_version()
+        self.assertEqual(contract.published_version_id, first)
+
+        now = fields.Datetime.now()
+        self.assertEqual(contract.get_version_in_force(now, "publication"), first)
+        self.assertFalse(contract.get_version_in_force(now))
+        self.env["contract.version.sign.wizard"].create(
+            {
+                "contract_id": contract.id,
+                "published_version_id": first.id,
+                "version_selection": "published",
+            }
+        ).action_sign()
+        later = now + datetime.timedelta(seconds=1)
+        self.assertEqual(contract.get_version_in_force(later), first)
+        self.assertEqual(
+            contract.version_event_ids.mapped("event"),
+            ["sign", "unpublish", "unpublish", "publish", "publish", "publish"],
+        )
+        with self.assertRaises(UserError):
+            contract.version_event_ids.unlink()
+
+    def test_sign_without_versions(self):
+        contract = self.make_contract()
+        self.env["contract.version.sign.wizard"].create(
+            {"contract_id": contract.id, "version_selection": "empty"}
+        ).action_sign()
+        self.assertEqual(contract.state, "sign")
+        self.assertFalse(contract.signed_version_id)
+        self.assertFalse(
+            contract.version_event_ids.filtered(lambda event: event.event == "sign")
+        )
+        self.assertTrue(all(contract.version_event_ids.mapped("version_id")))
@@ -0,0 +1,52 @@
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import ContractCase
+
+
+@tagged("post_install", "-at_install")
+class TestContractVersionTree(ContractCase):
+    def test_tree(self):
+        version = self.make_contract(sections=3, lines=2).published_version_id
+        tree = version.get_tree()
+        self.assertEqual(tree["id"], version.id)
+        self.assertEqual(tree["version_number"], 1)
+        self.assertEqual(
+            [section["id"] for section in tree["sections"]], version.section_ids.ids
+        )
+        line = version.section_ids[0].line_ids[0]
+        self.assertEqual(
+            tree["sections"][0]["lines"][0],
+            {
+                "id": line.id,
+                "number": line.number,
+                "sequence": line.sequence,
+                "content_id": line.current_content_id.id,
+                "text": line.current_content_text,
+                "history_ids": sorted(line.content_ids.ids, reverse=True),
+            },
+        )
+        self.assertIsNone(tree["next_after"])
+
+    def test_field_selection_and_paging(self):
+        version = self.make_contract(sections=5, lines=1).published_version_id
+        fields = {"version": ["name"], "section": ["number"], "line": ["text"]}
+        self.env.flush_all()
+        with self.assertQueryCount(1):
+            page = version.get_tree(fields=fields, limit=2)
+        self.assertEqual(set(page), {"id", "name", "sections", "next_after"})
+        self.assertEqual(set(page["sections"][0]), {"id", "number", "lines"})
+        self.assertEqual(set(page["sections"][0]["lines"][0]), {"id", "text"})
+
+        section_ids = []
+        while True:
+            section_ids += [section["id"] for section in page["sections"]]
+            if not page["next_after"]:
+                break
+            page = version.get_tree(
+                fields=fields, after_section_id=page["next_after"], limit=2
+            )
+        self.assertEqual(section_ids, version.section_ids.ids)
+
+        with self.assertRaises(UserError):
+            version.get_tree(fields={"line": ["unknown"]})
@@ -5,3 +5,4 @@ from . import contract_line_wizard
 from . import confirm_delete_wizard
 from . import contract_section_wizard
 from . import contract_version_creation_wizard
+from . import contract_version_diff_wizard
@@ -1,5 +1,7 @@
 from odoo import models, fields, api
 
+from ..models.contract_profile import profiled
+
 
 class ContractContentWizard(models.TransientModel):
     _name = "contract.content.wizard"
@@ -7,6 +9,7 @@ class ContractContentWizard(models.TransientModel):
 
     content = fields.Text("Content", required=True)
 
+    @profiled("save_content")
     def button_save(self):
         line_id = self.env.context.get("active_id", False)
 
@@ -19,15 +22,10 @@ class ContractContentWizard(models.TransientModel):
                 self.save_new_content(line)
 
     def find_existing_content(self, line):
-        return self.env["contract.content"].search(
-            [("content", "=", self.content), ("line_ids", "in", [line.id])], limit=1
+        content_hash = self.env["contract.content"]._hash_content(self.content)
+        return line.current_content_id.filtered(
+            lambda content: content.content_hash == content_hash
         )
 
     def save_new_content(self, line):
-        new_content = self.env["contract.content"].create({"content": self.content})
-        line.write(
-            {
-                "content_ids": [(4, new_content.id)],
-                "current_content_id": new_content.id,
-            }
-        )
+        line._set_content(self.content)
@@ -1,6 +1,8 @@
 from odoo import models, fields, _
 from odoo.exceptions import UserError
 
+from ..models.contract_profile import profiled
+
 
 class ContractLineWizard(models.TransientModel):
     _name = "contract.line.wizard"
@@ -11,12 +13,13 @@ class ContractLineWizard(models.TransientModel):
     content_text = fields.Text(string="Content")
     number = fields.Char(string="Number")
 
+    @profiled("create_clause")
     def button_create(self):
         self.ensure_one()
         if not self.content_text:
             raise UserError(_("Content can't be empty."))
 
-        content = self.env["contract.content"].create({"content": self.content_text})
+        content = self.env["contract.content"]._find_or_create(self.content_text)
 
         new_line = self.env["contract.line"].create(
             {
@@ -1,5 +1,7 @@
 from odoo import models, fields, api
 
+from ..models.contract_profile import profiled
+
 
 class ContractPublishWizard(models.TransientModel):
     _name = "contract.publish_wizard"
@@ -13,11 +15,11 @@ class ContractPublishWizard(models.TransientModel):
         domain="[('contract_id', '=', contract_id),('is_published', '=', False)]",
     )
 
+    @profiled("action_publish_version")
     def action_publish_version(self):
         self.ensure_one()
         contract = self.contract_id
         version = self.version_id
 
         if version and version.contract_id == contract:
-            contract.published_version_id = version
-            version.is_published = True
+            version.publish_version()
@@ -1,6 +1,8 @@
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 
+from ..models.contract_profile import profiled
+
 
 class ContractSectionWizard(models.TransientModel):
     _name = "contract.section.wizard"
@@ -11,6 +13,7 @@ class ContractSectionWizard(models.TransientModel):
     name = fields.Char(string="Section Name", required=True)
     number = fields.Char(string="Section Number", required=True)
 
+    @profiled("create_section")
     def button_create(self):
         self.ensure_one()
         if not self.name:
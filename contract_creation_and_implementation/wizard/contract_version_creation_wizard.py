@@ -1,6 +1,8 @@
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 
+from ..models.contract_profile import profiled
+
 
 class ContractVersionCreationWizard(models.TransientModel):
     _name = "contract.version.creation.wizard"
@@ -14,6 +16,7 @@ class ContractVersionCreationWizard(models.TransientModel):
         domain="[('contract_id', '=', contract_id)]",
     )
 
+    @profiled("button_create_new_version")
     def button_create_new_version(self):
         self.ensure_one()
         contract = self.contract_id
@@ -32,9 +35,6 @@ class ContractVersionCreationWizard(models.TransientModel):
             }
         )
 
-        for section in base_version.section_ids:
-            new_section = section.copy({"version_id": new_version.id})
-            for line in section.line_ids:
-                line.copy({"section_id": new_section.id, "contract_id": contract.id})
+        base_version.copy_tree_to(new_version)
 
         return {"type": "ir.actions.act_window_close"}
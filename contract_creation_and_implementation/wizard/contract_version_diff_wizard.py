@@ -0,0 +1,109 @@
+import json
+
+from odoo import models, fields, api
+
+
+class ContractVersionDiffWizard(models.TransientModel):
+    _name = "contract.version.diff.wizard"
+    _description = "Wizard to Compare Contract Versions"
+
+    contract_id = fields.Many2one("contract.contract", string="Contract", required=True)
+    version_id = fields.Many2one(
+        "contract.version",
+        string="Version",
+        required=True,
+        domain="[('contract_id', '=', contract_id)]",
+    )
+    base_version_id = fields.Many2one(
+        "contract.version",
+        string="Compared With",
+        required=True,
+        domain="[('contract_id', '=', contract_id)]",
+    )
+    line_ids = fields.One2many(
+        "contract.version.diff.line", "wizard_id", string="Changes", readonly=True
+    )
+    next_key = fields.Char(
+        readonly=True, help="Key of the last change shown, when more follow"
+    )
+
+    # changes materialized per page of the wizard
+    _page_size = 1000
+
+    def button_compare(self):
+        self.ensure_one()
+        self.version_id._check_diff_access(self.base_version_id)
+        return self._show_changes()
+
+    def button_next_changes(self):
+        self.ensure_one()
+        self.version_id._check_diff_access(self.base_version_id)
+        return self._show_changes(json.loads(self.next_key))
+
+    def _show_changes(self, after_key=None):
+        """Replace the lines of the wizard with the page of changes following
+        ``after_key``."""
+        self.line_ids.unlink()
+        changes = list(
+            self.version_id._iter_diff(self.base_version_id, after_key, self._page_size)
+        )
+        self.env["contract.version.diff.line"].create(
+            [
+                {
+                    "wizard_id": self.id,
+                    "type": change["type"],
+                    "change": change["change"],
+                    "number": change["number"],
+                    "name": change["name"],
+                    "old_content_id": change["old_content_id"],
+                    "new_content_id": change["new_content_id"],
+                }
+                for change in changes
+            ]
+        )
+        self.next_key = (
+            json.dumps(changes[-1]["key"]) if len(changes) == self._page_size else False
+        )
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }
+
+
+class ContractVersionDiffLine(models.TransientModel):
+    _name = "contract.version.diff.line"
+    _description = "Contract Version Difference"
+
+    wizard_id = fields.Many2one(
+        "contract.version.diff.wizard", required=True, ondelete="cascade"
+    )
+    type = fields.Selection(
+        [("section", "Section"), ("line", "Clause")], string="Type", required=True
+    )
+    change = fields.Selection(
+        [
+            ("added", "Added"),
+            ("removed", "Removed"),
+            ("changed", "Changed"),
+            ("moved", "Moved"),
+        ],
+        string="Change",
+        required=True,
+    )
+    number = fields.Char(string="Number")
+    name = fields.Char(string="Name")
+    old_content_id = fields.Many2one("contract.content", string="Old content")
+    new_content_id = fields.Many2one("contract.content", string="New content")
+    text_diff = fields.Text(string="Difference", compute="_compute_text_diff")
+
+    @api.depends("old_content_id", "new_content_id")
+    def _compute_text_diff(self):
+        # computed for the displayed page only, texts are never read upfront
+        for record in self:
+            record.text_diff = self.env["contract.version"]._text_diff(
+                record.old_content_id.full_text or "",
+                record.new_content_id.full_text or "",
+            )
@@ -1,6 +1,8 @@
 from odoo import models, fields, api
 from datetime import datetime
 
+from ..models.contract_profile import profiled
+
 
 class ContractVersionSignWizard(models.TransientModel):
     _name = "contract.version.sign.wizard"
@@ -34,6 +36,7 @@ class ContractVersionSignWizard(models.TransientModel):
             )
         return res
 
+    @profiled("action_sign")
     def action_sign(self):
         self.ensure_one()
         vals = {"state": "sign"}
@@ -44,6 +47,16 @@ class ContractVersionSignWizard(models.TransientModel):
         if self.version_selection == "published":
             self.contract_id.signed_version_id = self.published_version_id
             self.contract_id.signed_version_id.is_signed = True
+            self.env["contract.version.event"]._log(
+                [
+                    {
+                        "contract_id": self.contract_id.id,
+                        "version_id": self.published_version_id.id,
+                        "event": "sign",
+                        "in_force_version_id": self.published_version_id.id,
+                    }
+                ]
+            )
         else:
             self.contract_id.signed_version_id = False
         return {"type": "ir.actions.act_window_close"}